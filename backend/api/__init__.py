@@ -4,42 +4,72 @@ from core.config import Config
 from repositories.database_manager import DatabaseManager
 
 # Import Services & Infrastructure
-from infrastructure.vector_store import VectorStoreManager
+from infrastructure.sharded_index import ShardedIndexManager
 from infrastructure.llm_client import LLMClient
+from infrastructure.warmup import Warmup
 from services.chat_service import ChatService
 from services.document_service import DocumentService
+from services.index_job_service import IndexJobService
+from services.maintenance_service import MaintenanceService
+from services.archive_service import ArchiveService
+from repositories.counter_repo import CounterRepository
+from repositories.analytics_repo import AnalyticsRepository
 
 # Import Blueprints
 from api.routes.auth_routes import auth_bp
 from api.routes.chat_routes import chat_bp
 from api.routes.admin_routes import admin_bp
 from api.routes.editor_routes import editor_bp
+from api.routes.health_routes import health_bp
 
 def create_app():
     app = Flask(__name__)
-    CORS(app)
+    # Admin list endpoints return the next-page cursor in a header
+    CORS(app, expose_headers=["X-Next-Cursor"])
     
     # 1. Initialize Database Tables
     DatabaseManager.initialize_databases()
     
-    # 2. Initialize Heavy AI Components (Singletons)
-    print("--- Loading AI Components... ---")
-    vector_manager = VectorStoreManager()
-    retriever = vector_manager.load_or_create_index()
+    # 2. Initialize AI Components (Singletons)
+    # The chat chain starts without a retriever; index versions go live in it as soon as they load
+    vector_manager = ShardedIndexManager()
+    llm_client = LLMClient(None)
+    vector_manager.add_swap_listener(llm_client.swap_retriever)
     
-    llm_client = LLMClient(retriever)
+    # Heavy loading (embedding model, FAISS shards) runs in the background,
+    # so admin/editor endpoints and /healthz answer immediately. See /readyz.
+    print("--- Loading AI Components in background... ---")
+
+    def load_ai_components():
+        llm_client.load()
+        return vector_manager.load_or_create_index()
+
+    warmup = Warmup()
+    warmup.start(load_ai_components)
     
     # 3. Initialize Services
-    chat_service = ChatService(llm_client)
+    chat_service = ChatService(llm_client, warmup)
     doc_service = DocumentService(vector_manager)
+    index_jobs = IndexJobService(doc_service, warmup)
+
+    # Periodic database upkeep
+    maintenance = MaintenanceService()
+    maintenance.add_job("reconcile_counters", Config.COUNTER_RECONCILE_INTERVAL, CounterRepository.reconcile)
+    maintenance.add_job("refresh_rollups", Config.ROLLUP_INTERVAL, AnalyticsRepository.refresh, run_at_start=True)
+    maintenance.add_job("archive_chats", Config.ARCHIVE_INTERVAL, ArchiveService.archive_old_chats)
+    maintenance.start()
     
     # 4. Attach to App Config (Dependency Injection)
     app.config['vector_manager'] = vector_manager
     app.config['llm_client'] = llm_client
     app.config['chat_service'] = chat_service
     app.config['doc_service'] = doc_service
+    app.config['index_jobs'] = index_jobs
+    app.config['warmup'] = warmup
+    app.config['maintenance'] = maintenance
     
     # 5. Register Routes
+    app.register_blueprint(health_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(chat_bp)
     app.register_blueprint(admin_bp, url_prefix='/admin')
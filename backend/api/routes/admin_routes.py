@@ -1,29 +1,83 @@
 import os
-import io
-import csv
-from flask import Blueprint, jsonify, request, make_response
+from flask import Blueprint, jsonify, request, Response, stream_with_context, current_app
+from datetime import date
 from services.admin_service import AdminService
+from services.export_service import ExportService
+from services.archive_service import ArchiveService
+from repositories.pagination import decode_cursor
+from core.config import Config
 from core.constants import EMAIL_CONFIG_FILE
 
 admin_bp = Blueprint('admin', __name__)
 
+def _filter_args(*filters):
+    """Reads the given filters (start/end as YYYY-MM-DD) from the query string. Raises ValueError on malformed dates."""
+    args = {}
+    for name in filters:
+        value = request.args.get(name) or None
+        if value and name in ('start', 'end'):
+            date.fromisoformat(value)
+        args[name] = value
+    return args
+
+def _page_args(*filters):
+    """
+    Reads ?cursor=&limit= plus the given filters from the query string.
+    Raises ValueError on malformed input.
+    """
+    args = {
+        "cursor": request.args.get('cursor') or None,
+        "limit": min(max(int(request.args.get('limit', Config.ADMIN_PAGE_SIZE)), 1), Config.ADMIN_MAX_PAGE_SIZE),
+    }
+    if args["cursor"]:
+        decode_cursor(args["cursor"])
+    args.update(_filter_args(*filters))
+    return args
+
+def _export_response(dataset, fmt, gzip, **filters):
+    chunks, mimetype, filename = ExportService.stream(dataset, fmt, gzip, **filters)
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+def _page_response(page):
+    """The body stays a plain JSON list; the cursor for the next page goes in X-Next-Cursor."""
+    rows, next_cursor = page
+    response = jsonify(rows)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
 # --- Stats Counter ---
 @admin_bp.route('/stats', methods=['GET'])
 def get_stats():
     return jsonify(AdminService.get_dashboard_stats())
 
 # --- Detailed Lists ---
+# Keyset-paginated: ?limit=&cursor=<X-Next-Cursor of the previous page>, plus filters
 @admin_bp.route('/all-users', methods=['GET'])
 def get_all_users():
-    return jsonify(AdminService.get_all_users())
+    try:
+        args = _page_args('start', 'end', 'phone')
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+    return _page_response(AdminService.get_all_users(**args))
 
 @admin_bp.route('/chat-history', methods=['GET'])
 def get_chat_history():
-    return jsonify(AdminService.get_all_chats())
+    try:
+        args = _page_args('start', 'end', 'category', 'phone')
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+    return _page_response(AdminService.get_all_chats(**args))
 
 @admin_bp.route('/escalated-queries', methods=['GET'])
 def get_escalations():
-    return jsonify(AdminService.get_escalations())
+    try:
+        args = _page_args('start', 'end', 'category', 'status', 'phone')
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+    return _page_response(AdminService.get_escalations(**args))
 
 @admin_bp.route('/update-query/<int:query_id>', methods=['PUT'])
 def update_query(query_id):
@@ -42,51 +96,160 @@ def update_query(query_id):
 def get_today_users():
     return jsonify(AdminService.get_today_users())
 
+def _limit_offset():
+    """Optional ?limit=&offset= (no limit when absent). Raises ValueError on malformed input."""
+    limit = request.args.get('limit')
+    offset = int(request.args.get('offset', 0))
+    if limit is None:
+        return None, max(offset, 0)
+    return min(max(int(limit), 1), Config.ADMIN_MAX_PAGE_SIZE), max(offset, 0)
+
 @admin_bp.route('/escalated-users', methods=['GET'])
 def get_escalated_users():
-    return jsonify(AdminService.get_escalated_users_summary())
+    try:
+        limit, offset = _limit_offset()
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    return jsonify(AdminService.get_escalated_users_summary(limit, offset))
 
 @admin_bp.route('/solved-users', methods=['GET'])
 def get_solved_users():
-    return jsonify(AdminService.get_solved_users_summary())
+    try:
+        limit, offset = _limit_offset()
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    return jsonify(AdminService.get_solved_users_summary(limit, offset))
 
 # [MODIFIED] Use phone instead of email for user query lookup
 @admin_bp.route('/user-queries/<phone>', methods=['GET'])
 def get_user_queries(phone):
     return jsonify(AdminService.get_user_queries(phone))
 
+# --- Full-Text Search ---
+# ?q=<words, trailing * for prefix>&source=chats|escalations&limit=&offset= plus start/end/category/status/phone
+# Snippets wrap each matched term in \u0002 ... \u0003 for the client to highlight
+@admin_bp.route('/search', methods=['GET'])
+def search():
+    text = request.args.get('q', '').strip()
+    source = request.args.get('source', 'chats')
+    if not text:
+        return jsonify({"error": "q is required"}), 400
+    if source not in ('chats', 'escalations'):
+        return jsonify({"error": "source must be chats or escalations"}), 400
+    try:
+        filters = _filter_args('start', 'end', 'category', 'status')
+        limit = min(max(int(request.args.get('limit', 20)), 1), Config.ADMIN_MAX_PAGE_SIZE)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+    filters["phone_number"] = request.args.get('phone') or None
+
+    results, has_more = AdminService.search(source, text, limit, offset, **filters)
+    return jsonify({"results": results, "limit": limit, "offset": offset, "has_more": has_more})
+
+# --- Analytics ---
+# ?granularity=day|hour&start=YYYY-MM-DD&end=YYYY-MM-DD (default: last 30 days, daily)
+@admin_bp.route('/analytics', methods=['GET'])
+def get_analytics():
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in ('day', 'hour'):
+        return jsonify({"error": "granularity must be day or hour"}), 400
+    try:
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else None
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else None
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+    if start and end and start > end:
+        return jsonify({"error": "start must not be after end"}), 400
+    if granularity == 'hour' and start and end and (end - start).days > Config.ANALYTICS_MAX_HOURLY_DAYS:
+        return jsonify({"error": f"hourly ranges are limited to {Config.ANALYTICS_MAX_HOURLY_DAYS} days"}), 400
+    return jsonify(AdminService.get_analytics(granularity, start, end))
+
 # --- Editor/Staff Logs ---
 @admin_bp.route('/editor-staff', methods=['GET'])
 def get_editor_staff():
     return jsonify(AdminService.get_editor_staff())
 
+def _log_filter_args():
+    """?search=&filter=10days|30days|all plus an optional start/end date range. Raises ValueError on bad dates."""
+    args = {
+        "search_term": request.args.get('search', ''),
+        "filter_period": request.args.get('filter', 'all'),
+    }
+    args.update(_filter_args('start', 'end'))
+    return args
+
 @admin_bp.route('/editor-logs', methods=['GET'])
 def get_editor_logs():
-    search = request.args.get('search', '')
-    filter_period = request.args.get('filter', 'all')
-    return jsonify(AdminService.get_editor_logs(search, filter_period))
+    try:
+        args = _log_filter_args()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+    return jsonify(AdminService.get_editor_logs(**args))
 
 @admin_bp.route('/download-editor-logs', methods=['GET'])
 def download_editor_logs():
-    search = request.args.get('search', '')
-    filter_period = request.args.get('filter', 'all')
-    
-    logs = AdminService.get_editor_logs(search, filter_period)
-    
-    si = io.StringIO()
-    cw = csv.writer(si)
-    
-    if logs:
-        cw.writerow(logs[0].keys())
-        for row in logs:
-            cw.writerow(row.values())
-    else:
-        cw.writerow(['No logs found'])
-
-    output = make_response(si.getvalue())
-    output.headers["Content-Disposition"] = "attachment; filename=editor_logs.csv"
-    output.headers["Content-type"] = "text/csv"
-    return output
+    try:
+        args = _log_filter_args()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+    return _export_response("edit_logs", "csv", False, **args)
+
+# --- Streaming Exports ---
+# /export/<dataset>?format=csv|ndjson&gzip=1 plus the dataset's list filters; rows are streamed in batches
+EXPORT_FILTERS = {
+    "chat_history": ('start', 'end', 'category', 'phone'),
+    "escalated_queries": ('start', 'end', 'category', 'status', 'phone'),
+}
+
+@admin_bp.route('/export/<dataset>', methods=['GET'])
+def export_dataset(dataset):
+    if dataset not in ExportService.DATASETS:
+        return jsonify({"error": f"Unknown dataset: {dataset}"}), 404
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in ExportService.FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    gzip = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+    try:
+        if dataset == "edit_logs":
+            filters = _log_filter_args()
+        else:
+            filters = _filter_args(*EXPORT_FILTERS[dataset])
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+    return _export_response(dataset, fmt, gzip, **filters)
+
+# --- Archived Chat History ---
+@admin_bp.route('/archives', methods=['GET'])
+def get_archives():
+    """Manifest of chat history archive files."""
+    return jsonify(ArchiveService.list_archives())
+
+# ?start=&end=&phone=&category=&limit=&offset=; reads the matching archive files on demand, oldest first
+@admin_bp.route('/archive/chat-history', methods=['GET'])
+def get_archived_chats():
+    try:
+        filters = _filter_args('start', 'end', 'phone', 'category')
+        limit = min(max(int(request.args.get('limit', Config.ADMIN_PAGE_SIZE)), 1), Config.ADMIN_MAX_PAGE_SIZE)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+    chats, has_more = ArchiveService.query_archived_chats(limit=limit, offset=offset, **filters)
+    return jsonify({"results": chats, "limit": limit, "offset": offset, "has_more": has_more})
+
+# --- Maintenance Jobs ---
+@admin_bp.route('/maintenance', methods=['GET'])
+def get_maintenance_status():
+    return jsonify(current_app.config['maintenance'].status())
+
+@admin_bp.route('/maintenance/<job_name>', methods=['POST'])
+def run_maintenance_job(job_name):
+    """Runs a maintenance job now (e.g. reconcile_counters) and returns its result."""
+    job = current_app.config['maintenance'].run_now(job_name)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_name}"}), 404
+    return jsonify(job)
 
 # --- NEW: Email Config Routes (Fixed 404) ---
 @admin_bp.route('/get-email-config', methods=['GET'])
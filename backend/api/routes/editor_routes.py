@@ -98,6 +98,14 @@ def get_documents():
 @editor_bp.route('/get-document-content', methods=['POST'])
 def get_content():
     doc_service = current_app.config['doc_service']
+    # ?page=N returns a single page instead of the whole document
+    page = request.args.get('page', type=int)
+    if page is not None:
+        result, error = doc_service.read_document_page(request.json.get('filename'), page)
+        if error:
+            return jsonify({"error": error}), 400
+        return jsonify(result)
+
     content, error = doc_service.read_document(request.json.get('filename'))
     if error:
         return jsonify({"error": error}), 400
@@ -158,12 +166,26 @@ def download_file():
 
 @editor_bp.route('/commit-index', methods=['POST'])
 def commit_index():
+    # Runs in the background; the new index version is swapped into the chat chain when done
+    index_jobs = current_app.config['index_jobs']
+    data = request.json or {}
+    # Optional 'folder' limits the update to that folder's index shard
+    job = index_jobs.submit(data.get('staff_id'), data.get('folder'))
+    return jsonify({"status": "accepted", "message": "Index update started", "job_id": job["job_id"]}), 202
+
+@editor_bp.route('/index-jobs/<job_id>', methods=['GET'])
+def get_index_job(job_id):
+    index_jobs = current_app.config['index_jobs']
+    job = index_jobs.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@editor_bp.route('/rollback-index', methods=['POST'])
+def rollback_index():
     doc_service = current_app.config['doc_service']
-    staff_id = request.json.get('staff_id')
-    success = doc_service.rebuild_index(staff_id)
-    if success:
-        vector_manager = current_app.config['vector_manager']
-        llm_client = current_app.config['llm_client']
-        llm_client.retriever = vector_manager.retriever
-        return jsonify({"status": "success", "message": "Index rebuilt"})
-    return jsonify({"error": "Rebuild failed"}), 500
\ No newline at end of file
+    data = request.json or {}
+    version = doc_service.rollback_index(data.get('version'), data.get('staff_id'), data.get('folder', 'Main Folder'))
+    if version:
+        return jsonify({"status": "success", "message": f"Index rolled back to {version}", "version": version})
+    return jsonify({"error": "No index version to roll back to"}), 400
\ No newline at end of file
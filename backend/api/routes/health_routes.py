@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify, current_app
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving HTTP."""
+    return jsonify({"status": "ok"})
+
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: the knowledge base is loaded and chat can answer."""
+    warmup = current_app.config['warmup']
+    status = warmup.status()
+    return jsonify(status), (200 if warmup.is_ready else 503)
@@ -0,0 +1,130 @@
+"""
+SQLite connection benchmark: a fresh sqlite3.connect() per operation in rollback-journal mode
+(how the repositories used to work) against the pooled WAL connections from repositories.connection.
+
+Each worker thread runs a mix of chat inserts and recent-history reads against its own copy of the
+chat_history schema in a temporary directory; per-operation latency is reported for both setups.
+
+Usage (from the backend directory):
+    python benchmarks/db_benchmark.py
+    python benchmarks/db_benchmark.py --threads 16 --ops 1000 --write-ratio 0.3
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+from statistics import mean, quantiles
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Config exits without these; the benchmark never contacts either service
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("email_id", "benchmark@example.com")
+
+from repositories.connection import ConnectionManager  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    user_name TEXT,
+    email TEXT,
+    phone_number TEXT,
+    user_query TEXT,
+    bot_response TEXT,
+    category TEXT
+)
+"""
+INSERT = """
+    INSERT INTO chat_history (timestamp, user_name, email, phone_number, user_query, bot_response, category)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+SELECT = "SELECT * FROM chat_history WHERE phone_number = ? ORDER BY timestamp DESC LIMIT 20"
+
+PHONES = [f"9{n:09d}" for n in range(200)]
+
+
+def seed(db_path, rows):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(SCHEMA)
+        conn.executemany(INSERT, [
+            (f"2024-01-01T00:{n % 60:02d}:00+05:30", "User", "", random.choice(PHONES),
+             "What is the admission process?", "Please visit the admissions office.", "Admissions")
+            for n in range(rows)
+        ])
+    conn.close()
+
+
+def run_operation(conn, rng, write_ratio):
+    if rng.random() < write_ratio:
+        with conn:
+            conn.execute(INSERT, (time.strftime("%Y-%m-%dT%H:%M:%S+05:30"), "User", "", rng.choice(PHONES),
+                                  "When does the semester start?", "In July.", "Academics"))
+    else:
+        with conn:
+            conn.execute(SELECT, (rng.choice(PHONES),)).fetchall()
+
+
+def worker(get_connection, release, ops, write_ratio, latencies, errors, seed_value):
+    rng = random.Random(seed_value)
+    for _ in range(ops):
+        start = time.perf_counter()
+        try:
+            conn = get_connection()
+            run_operation(conn, rng, write_ratio)
+            release(conn)
+        except sqlite3.OperationalError:
+            errors.append(1)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run(label, get_connection, release, args):
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=worker, args=(get_connection, release, args.ops, args.write_ratio, latencies, errors, n))
+        for n in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    cuts = quantiles(latencies, n=100)
+    print(f"{label:<28} {mean(latencies):>8.3f} {cuts[49]:>8.3f} {cuts[94]:>8.3f} {cuts[98]:>8.3f} "
+          f"{len(latencies) / elapsed:>10.0f} {len(errors):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-connection vs pooled WAL SQLite latency under concurrency.")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=500, help="Operations per thread")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--rows", type=int, default=20000, help="Rows seeded before the run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = os.path.join(tmp, "legacy.db")
+        pooled_db = os.path.join(tmp, "pooled.db")
+        seed(legacy_db, args.rows)
+        seed(pooled_db, args.rows)
+
+        print(f"{args.threads} threads x {args.ops} ops, {int(args.write_ratio * 100)}% writes, {args.rows} seeded rows")
+        print(f"{'setup':<28} {'mean ms':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'ops/s':>10} {'errors':>7}")
+
+        # Default sqlite3 settings, connection opened and closed around every operation
+        run("connect per operation", lambda: sqlite3.connect(legacy_db, timeout=5), lambda conn: conn.close(), args)
+
+        manager = ConnectionManager()
+        run("pooled WAL connections", lambda: manager.connect(pooled_db), lambda conn: None, args)
+        manager.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Cold-start benchmark.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter, reports the
+total and the slowest imports, and fails if
+  - any heavy dependency is imported eagerly (they must only load where they are used), or
+  - the total import time exceeds the budget.
+The few dependencies that are allowed to load eagerly are listed with their cost.
+
+The default module is `main`, so the measurement covers create_app() as well as the imports:
+database migrations and building every service on the real startup path (against the
+configured database). The warmup thread is kept from starting, because it loads the heavy
+modules on purpose, after startup.
+
+Usage (from the backend directory):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module services.admin_service --budget-ms 800
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported just by loading the app; each one is imported lazily where it's used
+HEAVY_MODULES = [
+    "langchain",
+    "langchain_community",
+    "langchain_google_genai",
+    "langchain_text_splitters",
+    "faiss",
+    "numpy",
+    "sentence_transformers",
+    "googleapiclient",
+    "google.oauth2",
+    "docx",
+    "pypdf",
+    "unstructured",
+]
+
+# Imported at startup on purpose, with the reason; their cost is reported on every run
+ALLOWED_EAGER = {
+    # EmbeddingProvider subclasses Embeddings (FAISS checks isinstance), so the base class
+    # has to exist when infrastructure.embeddings is imported by the index managers
+    "langchain_core": "base class of EmbeddingProvider",
+}
+
+# Warmup.start() becomes a no-op, so only the synchronous startup path is measured
+PRELUDE = "import infrastructure.warmup as w; w.Warmup.start = lambda self, target: None; "
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module):
+    """Returns [(cumulative_us, self_us, depth, name)] for every module imported."""
+    env = dict(os.environ)
+    # Config exits without these; nothing is contacted at import time
+    env.setdefault("GOOGLE_API_KEY", "benchmark")
+    env.setdefault("email_id", "benchmark@example.com")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{PRELUDE}import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, name))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the backend.")
+    parser.add_argument("--module", default="main", help="Module to import (default: main, which runs create_app())")
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Fail if total import time exceeds this")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show")
+    args = parser.parse_args()
+
+    rows = measure(args.module)
+    total_ms = sum(self_us for _, self_us, _, _ in rows) / 1000
+    top_level = sorted((r for r in rows if r[2] == 0), reverse=True)
+
+    print(f"import {args.module}: {total_ms:.0f} ms across {len(rows)} modules (budget {args.budget_ms:.0f} ms)\n")
+    print(f"{'cumulative ms':>14}  module")
+    for cumulative_us, _, _, name in top_level[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {name}")
+
+    imported = {name for _, _, _, name in rows}
+    eager = [m for m in HEAVY_MODULES if m in imported]
+
+    allowed = {name: cumulative_us for cumulative_us, _, _, name in rows if name in ALLOWED_EAGER}
+    if allowed:
+        print("\nAllowed eager imports:")
+        for name, cumulative_us in allowed.items():
+            print(f"{cumulative_us / 1000:>14.1f}  {name} ({ALLOWED_EAGER[name]})")
+
+    failed = False
+    if eager:
+        print(f"\nFAIL: heavy modules imported eagerly: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"\nFAIL: import time {total_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("\nOK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Hot lookup benchmark before and after the secondary indexes (migrations 4 and 12).
+
+Builds a throwaway database at schema version 3 (no indexes), fills it with synthetic data
+(1M chat rows by default), times the hot queries, applies the remaining migrations and times
+them again. User upserts are timed as the old SELECT-then-UPDATE/INSERT before and as the
+single INSERT ... ON CONFLICT statement after; afterwards the queries filter and sort on the
+integer epoch columns backfilled by migration 12, as the repositories do.
+
+Usage (from the backend directory):
+    python benchmarks/index_benchmark.py
+    python benchmarks/index_benchmark.py --chats 200000 --repeat 50
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Config exits without these; the benchmark never contacts either service
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("email_id", "benchmark@example.com")
+
+from repositories.connection import ConnectionManager  # noqa: E402
+from repositories import migrations  # noqa: E402
+from repositories.migrations import migrate  # noqa: E402
+from repositories.timestamps import to_epoch, day_range  # noqa: E402
+
+CATEGORIES = ["Admissions", "Academics", "Hostel", "Placements", "Fees", "General"]
+START = datetime(2024, 1, 1)
+
+
+def iso(offset_seconds):
+    return (START + timedelta(seconds=offset_seconds)).isoformat() + "+05:30"
+
+
+def seed(conn, chats, users, escalations):
+    rng = random.Random(42)
+    span = 180 * 86400
+    phones = [f"9{n:09d}" for n in range(users)]
+
+    def batches(total, make, size=50000):
+        for start in range(0, total, size):
+            yield [make(n) for n in range(start, min(start + size, total))]
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO all_users (user_name, email, phone_number, first_seen, last_seen) VALUES (?, '', ?, ?, ?)",
+            [(f"User {n}", phone, iso(0), iso(rng.randrange(span))) for n, phone in enumerate(phones)]
+        )
+    for rows in batches(chats, lambda n: (iso(rng.randrange(span)), "User", "", rng.choice(phones),
+                                          "How do I apply for the hostel?", "Apply through the portal.",
+                                          rng.choice(CATEGORIES))):
+        with conn:
+            conn.executemany("""
+                INSERT INTO chat_history (timestamp, user_name, email, phone_number, user_query, bot_response, category)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+    for rows in batches(escalations, lambda n: (iso(rng.randrange(span)), "User", "", rng.choice(phones),
+                                                "Fee receipt missing", "Forwarded.",
+                                                rng.choice(["Initiated", "Finished"]), "", rng.choice(CATEGORIES))):
+        with conn:
+            conn.executemany("""
+                INSERT INTO escalated_queries (timestamp, user_name, email, phone_number, query_text, bot_response, status, remarks, category)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+    return phones
+
+
+def legacy_upsert(conn, phone, timestamp):
+    with conn:
+        if conn.execute("SELECT id FROM all_users WHERE phone_number = ?", (phone,)).fetchone():
+            conn.execute("UPDATE all_users SET last_seen = ? WHERE phone_number = ?", (timestamp, phone))
+        else:
+            conn.execute("INSERT INTO all_users (user_name, email, phone_number, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)",
+                         ("User", "", phone, timestamp, timestamp))
+
+
+def upsert(conn, phone, timestamp):
+    with conn:
+        conn.execute("""
+            INSERT INTO all_users (user_name, email, phone_number, first_seen, last_seen, first_seen_epoch, last_seen_epoch)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (phone_number) DO UPDATE SET last_seen = excluded.last_seen, last_seen_epoch = excluded.last_seen_epoch
+            RETURNING first_seen
+        """, ("User", "", phone, timestamp, timestamp, to_epoch(timestamp), to_epoch(timestamp))).fetchone()
+
+
+def queries(conn, phones, indexed):
+    rng = random.Random(7)
+    day = (START + timedelta(days=90)).date()
+    # Before: the old lexical ISO comparisons. After: the epoch columns and their indexes.
+    ts, last_seen = ("timestamp_epoch", "last_seen_epoch") if indexed else ("timestamp", "last_seen")
+    day_bounds = day_range(day.isoformat(), day.isoformat()) if indexed else (day.isoformat(), (day + timedelta(days=1)).isoformat())
+    return {
+        "user upsert": lambda: (upsert if indexed else legacy_upsert)(conn, rng.choice(phones), iso(rng.randrange(10**7))),
+        "escalations by phone": lambda: conn.execute(
+            f"SELECT * FROM escalated_queries WHERE phone_number = ? ORDER BY {ts} DESC", (rng.choice(phones),)).fetchall(),
+        "pending escalations (50)": lambda: conn.execute(
+            f"SELECT * FROM escalated_queries WHERE status = 'Initiated' ORDER BY {ts} DESC LIMIT 50").fetchall(),
+        "latest chats (50)": lambda: conn.execute(
+            f"SELECT * FROM chat_history ORDER BY {ts} DESC LIMIT 50").fetchall(),
+        "chats by phone": lambda: conn.execute(
+            f"SELECT * FROM chat_history WHERE phone_number = ? ORDER BY {ts} DESC", (rng.choice(phones),)).fetchall(),
+        "users active on a day": lambda: conn.execute(
+            f"SELECT * FROM all_users WHERE {last_seen} >= ? AND {last_seen} < ? ORDER BY {last_seen} DESC",
+            day_bounds).fetchall(),
+    }
+
+
+def time_queries(conn, phones, indexed, repeat):
+    results = {}
+    for name, run in queries(conn, phones, indexed).items():
+        run()  # warm the page cache
+        started = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        results[name] = (time.perf_counter() - started) * 1000 / repeat
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot query latency before and after the secondary indexes.")
+    parser.add_argument("--chats", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--escalations", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Never copy this deployment's legacy database files into the throwaway database
+        migrations.LEGACY_TABLES = {}
+        manager = ConnectionManager()
+        conn = manager.connect(os.path.join(tmp, "benchmark.db"))
+        migrate(conn, target=3)
+
+        started = time.perf_counter()
+        phones = seed(conn, args.chats, args.users, args.escalations)
+        print(f"Seeded {args.chats} chats, {args.users} users, {args.escalations} escalations "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        before = time_queries(conn, phones, indexed=False, repeat=args.repeat)
+        started = time.perf_counter()
+        migrate(conn)
+        print(f"Indexes built in {time.perf_counter() - started:.1f}s\n")
+        after = time_queries(conn, phones, indexed=True, repeat=args.repeat)
+
+        print(f"{'query':<28} {'before ms':>10} {'after ms':>10} {'speedup':>9}")
+        for name in before:
+            print(f"{name:<28} {before[name]:>10.2f} {after[name]:>10.3f} {before[name] / max(after[name], 1e-6):>8.0f}x")
+        manager.close_all()
+
+
+if __name__ == "__main__":
+    main()
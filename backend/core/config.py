@@ -31,6 +31,73 @@ class Config:
     EDITOR_EMAIL = "editor.bitra@bitsathy.ac.in"
     EDITOR_PASSWORD = "editor.pass.bitra@12345"
 
+    # --- Embedding Settings ---
+    # Provider used to embed documents and queries: "google" (remote API) or "local" (CPU model on disk)
+    EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "google")
+    # Directory holding a sentence-transformers model (e.g. bge-base-en-v1.5) for the local provider
+    LOCAL_EMBEDDING_MODEL_DIR = os.getenv("LOCAL_EMBEDDING_MODEL_DIR", "")
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+    # Index build pipeline: concurrent batches, rate limit (requests per second) and retries per batch
+    EMBEDDING_MAX_WORKERS = int(os.getenv("EMBEDDING_MAX_WORKERS", "4"))
+    EMBEDDING_RATE_LIMIT = float(os.getenv("EMBEDDING_RATE_LIMIT", "5"))
+    EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+    # Checkpoints of failed builds untouched for this long (seconds) are deleted; their inputs have likely changed
+    EMBEDDING_CHECKPOINT_MAX_AGE = int(os.getenv("EMBEDDING_CHECKPOINT_MAX_AGE", str(7 * 24 * 3600)))
+
+    # Document text extraction during index builds (worker processes, per-file timeout in seconds)
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 2)))
+    EXTRACTION_TIMEOUT = int(os.getenv("EXTRACTION_TIMEOUT", "120"))
+
+    # Number of built index versions kept on disk for rollback
+    INDEX_VERSIONS_TO_KEEP = int(os.getenv("INDEX_VERSIONS_TO_KEEP", "3"))
+
+    # Per-index overrides. Anything not listed falls back to the defaults above.
+    # The knowledge base is sharded by documents folder, so keys are folder names: "Main Folder" for
+    # files at the top of DOCUMENTS_DIR, otherwise the name of a top-level subfolder. (A standalone
+    # VectorStoreManager is looked up by the name of its index directory instead.)
+    # Example: {"Main Folder": {"provider": "local", "model": "/models/bge-base-en-v1.5"}}
+    INDEX_EMBEDDINGS = {}
+
+    @classmethod
+    def embedding_config_for(cls, index_name):
+        """Returns the embedding settings (provider, model, batch_size) for an index."""
+        defaults = {
+            "provider": cls.EMBEDDING_PROVIDER,
+            "model": cls.LOCAL_EMBEDDING_MODEL_DIR if cls.EMBEDDING_PROVIDER == "local" else None,
+            "batch_size": cls.EMBEDDING_BATCH_SIZE,
+        }
+        defaults.update(cls.INDEX_EMBEDDINGS.get(index_name, {}))
+        return defaults
+
+    # Seconds a chat request waits for the knowledge base to finish loading after startup
+    CHAT_WARMUP_WAIT = float(os.getenv("CHAT_WARMUP_WAIT", "5"))
+
+    # --- Database Settings ---
+    # How long a writer waits for a lock before failing, page cache per connection, prepared statements kept per connection
+    DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+    DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+    DB_STATEMENT_CACHE = int(os.getenv("DB_STATEMENT_CACHE", "128"))
+
+    # Admin list endpoints: rows per page by default, and the most a client may ask for
+    ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", "100"))
+    ADMIN_MAX_PAGE_SIZE = int(os.getenv("ADMIN_MAX_PAGE_SIZE", "500"))
+    # Rows read per batch by the streaming exports
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # Seconds between full recounts of the trigger-maintained dashboard counters
+    COUNTER_RECONCILE_INTERVAL = int(os.getenv("COUNTER_RECONCILE_INTERVAL", str(6 * 3600)))
+
+    # Seconds between analytics rollup refreshes, and the longest range served at hourly granularity
+    ROLLUP_INTERVAL = int(os.getenv("ROLLUP_INTERVAL", "300"))
+    ANALYTICS_MAX_HOURLY_DAYS = int(os.getenv("ANALYTICS_MAX_HOURLY_DAYS", "31"))
+
+    # Chat history older than this many days is moved out of the database into monthly archive files.
+    # ARCHIVE_COMPRESSION is "gzip" or "zstd" (needs the optional `zstandard` package; falls back to gzip).
+    CHAT_RETENTION_DAYS = int(os.getenv("CHAT_RETENTION_DAYS", "180"))
+    ARCHIVE_COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "gzip")
+    ARCHIVE_INTERVAL = int(os.getenv("ARCHIVE_INTERVAL", str(24 * 3600)))
+
     # --- Flask Settings ---
     DEBUG_MODE = True
     PORT = 5000
\ No newline at end of file
@@ -9,6 +9,14 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 DATABASE_DIR = os.path.join(DATA_DIR, "database")
 DOCUMENTS_DIR = os.path.join(DATA_DIR, "documents")
 FAISS_INDEX_DIR = os.path.join(DATA_DIR, "faiss_index_google")
+# Partial embedding results of interrupted index builds
+EMBEDDING_CHECKPOINT_DIR = os.path.join(DATA_DIR, "index_checkpoints")
+# Compressed text extracted from PDF/DOCX documents
+TEXT_CACHE_DIR = os.path.join(DATA_DIR, "text_cache")
+# Compressed NDJSON archives of old chat history
+ARCHIVE_DIR = os.path.join(DATA_DIR, "archive")
+# Chunk vectors reused across index builds
+EMBEDDING_CACHE_DB = os.path.join(DATA_DIR, "embedding_cache.db")
 
 # Google Credentials Files
 CLIENT_SECRET_FILE = os.path.join(BASE_DIR, "client_secret.json")
@@ -22,7 +30,11 @@ os.makedirs(DATABASE_DIR, exist_ok=True)
 os.makedirs(DOCUMENTS_DIR, exist_ok=True)
 
 # --- Database Paths ---
-DB_PATHS = {
+# All application data (users, chats, escalations, OTPs, staff, edit logs) lives in one database
+DATABASE_PATH = os.path.join(DATABASE_DIR, "bit_chatbot.db")
+
+# Per-entity database files used before the single database; imported once by the migrations
+LEGACY_DB_PATHS = {
     "USERS": os.path.join(DATABASE_DIR, "all_users.db"),
     "CHATS": os.path.join(DATABASE_DIR, "all_chats.db"),
     "ESCALATION": os.path.join(DATABASE_DIR, "user_details.db"),
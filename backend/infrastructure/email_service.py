@@ -1,10 +1,6 @@
 import os
 import base64
 from email.mime.text import MIMEText
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 from core.constants import TOKEN_FILE, EMAIL_CONFIG_FILE
 from core.config import Config
 
@@ -17,6 +13,11 @@ class EmailService:
     @staticmethod
     def get_service():
         """Authenticates and returns the Gmail service."""
+        from google.oauth2.credentials import Credentials
+        from google.auth.transport.requests import Request
+        from googleapiclient.discovery import build
+        from googleapiclient.errors import HttpError
+
         creds = None
         if os.path.exists(TOKEN_FILE):
             creds = Credentials.from_authorized_user_file(TOKEN_FILE, EmailService.SCOPES)
@@ -0,0 +1,96 @@
+import sqlite3
+import hashlib
+from datetime import datetime
+import pytz
+from core.constants import EMBEDDING_CACHE_DB
+
+IST = pytz.timezone('Asia/Kolkata')
+
+
+class EmbeddingCache:
+    """
+    Persistent chunk-embedding store backed by SQLite.
+    Vectors are stored as float32 blobs keyed by (embedding model, sha256 of the chunk text),
+    so unchanged chunks are never sent to the embeddings API twice.
+    """
+
+    # Max number of SQL variables per lookup
+    LOOKUP_BATCH = 500
+
+    def __init__(self, db_path=EMBEDDING_CACHE_DB):
+        self.db_path = db_path
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunk_embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """)
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def model_key(embedding_info):
+        return f"{embedding_info.get('provider')}:{embedding_info.get('model')}"
+
+    def get_many(self, model, hashes):
+        """Returns {text_hash: float32 vector} for the hashes present in the cache."""
+        import numpy as np
+
+        found = {}
+        hashes = list(hashes)
+        with sqlite3.connect(self.db_path) as conn:
+            for start in range(0, len(hashes), self.LOOKUP_BATCH):
+                batch = hashes[start:start + self.LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                cursor = conn.execute(
+                    f"SELECT text_hash, vector FROM chunk_embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                )
+                for text_hash, blob in cursor:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model, items):
+        """Stores (text_hash, vector) pairs."""
+        import numpy as np
+
+        created_at = datetime.now(IST).isoformat()
+        rows = []
+        for text_hash, vector in items:
+            vector = np.asarray(vector, dtype=np.float32)
+            rows.append((model, text_hash, vector.shape[0], vector.tobytes(), created_at))
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO chunk_embeddings (model, text_hash, dimension, vector, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+
+    def collect_garbage(self, referenced):
+        """
+        Deletes every cached vector whose (model, text_hash) is not in `referenced`,
+        i.e. no longer used by any index version kept on disk. Returns the number removed.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS live_chunks (model TEXT, text_hash TEXT, PRIMARY KEY (model, text_hash))")
+            conn.execute("DELETE FROM live_chunks")
+            conn.executemany("INSERT OR IGNORE INTO live_chunks VALUES (?, ?)", referenced)
+            cursor = conn.execute("""
+                DELETE FROM chunk_embeddings
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM live_chunks l
+                    WHERE l.model = chunk_embeddings.model AND l.text_hash = chunk_embeddings.text_hash
+                )
+            """)
+            removed = cursor.rowcount
+            conn.execute("DROP TABLE live_chunks")
+        if removed:
+            print(f"Embedding cache: removed {removed} unreferenced vectors.")
+        return removed
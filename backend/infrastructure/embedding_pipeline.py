@@ -0,0 +1,172 @@
+import os
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from core.config import Config
+from core.constants import EMBEDDING_CHECKPOINT_DIR
+from infrastructure.embedding_cache import EmbeddingCache
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Each embedding request takes one token;
+    tokens refill at `rate` per second up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class EmbeddingPipeline:
+    """
+    Embeds chunks for an index build in batches.
+    - Batches run concurrently on a bounded thread pool, throttled by a token bucket.
+    - A failed batch is retried on its own with exponential backoff.
+    - Finished batches are checkpointed to disk, so a failed build resumes where it stopped.
+      Checkpoints left by builds that were never resumed expire after EMBEDDING_CHECKPOINT_MAX_AGE.
+    - With a cache, only chunks never embedded before by this model are sent to the API.
+    """
+
+    def __init__(self, embeddings, batch_size=None, max_workers=None, rate_limit=None, max_retries=None,
+                 checkpoint_root=EMBEDDING_CHECKPOINT_DIR, cache=None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.batch_size = batch_size or Config.EMBEDDING_BATCH_SIZE
+        self.max_workers = max_workers or Config.EMBEDDING_MAX_WORKERS
+        self.max_retries = Config.EMBEDDING_MAX_RETRIES if max_retries is None else max_retries
+        self.bucket = TokenBucket(Config.EMBEDDING_RATE_LIMIT if rate_limit is None else rate_limit)
+        self.checkpoint_root = checkpoint_root
+
+    def _checkpoint_dir(self, texts):
+        """Checkpoints are keyed by the embedding model and the exact chunk list being built."""
+        digest = hashlib.sha256()
+        info = self.embeddings.describe()
+        digest.update(f"{info.get('provider')}|{info.get('model')}|{self.batch_size}".encode())
+        for text in texts:
+            digest.update(hashlib.sha256(text.encode("utf-8")).digest())
+        return os.path.join(self.checkpoint_root, digest.hexdigest()[:24])
+
+    def _prune_checkpoints(self, keep):
+        """Deletes checkpoint directories other than `keep` that no build has written to for too long."""
+        if not os.path.isdir(self.checkpoint_root):
+            return
+        cutoff = time.time() - Config.EMBEDDING_CHECKPOINT_MAX_AGE
+        for name in os.listdir(self.checkpoint_root):
+            path = os.path.join(self.checkpoint_root, name)
+            try:
+                if path != keep and os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+                    print(f"Removed expired embedding checkpoint {name}")
+            except OSError:
+                continue
+
+    def _embed_batch(self, batch, checkpoint_path):
+        import numpy as np
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                vectors = np.asarray(self.embeddings.embed_documents(batch), dtype=np.float32)
+                # Write then rename, so a crash never leaves a truncated checkpoint behind
+                with open(checkpoint_path + ".tmp", "wb") as f:
+                    np.save(f, vectors)
+                os.replace(checkpoint_path + ".tmp", checkpoint_path)
+                return vectors
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = 2 ** attempt
+                print(f"Embedding batch failed ({e}). Retrying in {delay}s...")
+                time.sleep(delay)
+
+    def embed(self, texts, progress_callback=None):
+        """
+        Returns one vector per text, in order.
+        Raises if any batch still fails after its retries; completed batches stay checkpointed.
+        """
+        if not texts:
+            return []
+        if not self.cache:
+            return self._embed_uncached(texts, progress_callback).tolist()
+
+        model = EmbeddingCache.model_key(self.embeddings.describe())
+        hashes = [EmbeddingCache.text_hash(t) for t in texts]
+        known = self.cache.get_many(model, set(hashes))
+
+        # Embed each missing text once, even if it appears in several chunks
+        missing = {}
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in known and text_hash not in missing:
+                missing[text_hash] = text
+        print(f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} chunks reused.")
+
+        if missing:
+            vectors = self._embed_uncached(list(missing.values()), progress_callback)
+            self.cache.put_many(model, zip(missing.keys(), vectors))
+            known.update(zip(missing.keys(), vectors))
+        elif progress_callback:
+            progress_callback(1, 1)
+
+        return [known[h].tolist() for h in hashes]
+
+    def _embed_uncached(self, texts, progress_callback=None):
+        """Embeds texts through the API in checkpointed batches. Returns a float32 matrix."""
+        import numpy as np
+
+        checkpoint_dir = self._checkpoint_dir(texts)
+        self._prune_checkpoints(keep=checkpoint_dir)
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        paths = [os.path.join(checkpoint_dir, f"batch_{n:05d}.npy") for n in range(len(batches))]
+        results = {}
+        pending = []
+        for number, path in enumerate(paths):
+            if os.path.exists(path):
+                results[number] = np.load(path)
+            else:
+                pending.append(number)
+
+        if results:
+            print(f"Resuming index build: {len(results)}/{len(batches)} batches already embedded.")
+
+        error = None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._embed_batch, batches[n], paths[n]): n for n in pending}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    # Keep collecting the other batches so their checkpoints are written
+                    error = error or e
+                    continue
+                if progress_callback:
+                    progress_callback(len(results), len(batches))
+
+        if error:
+            print(f"Embedding stopped with {len(results)}/{len(batches)} batches done. Rerun to resume.")
+            raise error
+
+        vectors = np.concatenate([results[n] for n in range(len(batches))])
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        return vectors
@@ -0,0 +1,156 @@
+import os
+from abc import ABC, abstractmethod
+from langchain_core.embeddings import Embeddings
+from core.config import Config
+
+
+class EmbeddingProvider(Embeddings, ABC):
+    """
+    Abstract base class for embedding backends.
+    Every provider exposes the LangChain Embeddings interface (so FAISS can use it directly)
+    plus a small description that is written into the index manifest.
+    """
+
+    name = "base"
+
+    def __init__(self, model, batch_size=32):
+        self.model = model
+        self.batch_size = batch_size
+        self.dimension = None
+
+    def describe(self):
+        """Identity of this provider, recorded in the index manifest."""
+        return {"provider": self.name, "model": self.model, "dimension": self.dimension}
+
+    def adopt(self, embedding_info):
+        """
+        Lets a provider that hasn't settled on a model yet take the one an existing index
+        was built with, so the index can be loaded without any remote call.
+        """
+
+    def ensure_ready(self):
+        """Called before building an index; may contact the backend to verify it works."""
+
+    @abstractmethod
+    def embed_documents(self, texts):
+        """Returns one vector per text."""
+
+    @abstractmethod
+    def embed_query(self, text):
+        """Returns the vector for a search query."""
+
+
+class GoogleEmbeddingProvider(EmbeddingProvider):
+    """
+    Remote embeddings through the Gemini API.
+    Nothing is sent over the network at construction. When an existing index was built
+    with one of the candidate models, that model is adopted from its manifest; only a
+    fresh build probes the candidates in order and keeps the first one that answers.
+    """
+
+    name = "google"
+    MODEL_CANDIDATES = [
+        "models/text-embedding-004",
+        "models/gemini-embedding-001"
+    ]
+
+    def __init__(self, model=None, batch_size=32):
+        super().__init__(model or self.MODEL_CANDIDATES[0], batch_size)
+        # An explicitly configured model is never swapped for another candidate
+        self.pinned = model is not None
+        self.verified = False
+        self.client = None
+
+    def _make_client(self, model):
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        return GoogleGenerativeAIEmbeddings(model=model)
+
+    def adopt(self, embedding_info):
+        model = embedding_info.get("model")
+        if self.pinned or self.verified or model not in self.MODEL_CANDIDATES:
+            return
+        if model != self.model:
+            self.model, self.client = model, None
+        self.dimension = embedding_info.get("dimension")
+        self.pinned = True
+
+    def ensure_ready(self):
+        """Picks a working model before a build. This is the only place a test request is made."""
+        if self.verified:
+            return
+        candidates = [self.model] if self.pinned else self.MODEL_CANDIDATES
+        for model in candidates:
+            try:
+                print(f"--- Attempting to load model: {model} ---")
+                client = self._make_client(model)
+                self.dimension = len(client.embed_query("test"))
+                self.model, self.client, self.verified = model, client, True
+                print(f"Success! Using: {model}")
+                return
+            except Exception as e:
+                print(f"Model {model} failed: {e}")
+        raise RuntimeError("No Google embedding models worked. Check API Key.")
+
+    def _get_client(self):
+        if self.client is None:
+            self.client = self._make_client(self.model)
+        return self.client
+
+    def embed_documents(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._get_client().embed_documents(texts[start:start + self.batch_size]))
+        return vectors
+
+    def embed_query(self, text):
+        return self._get_client().embed_query(text)
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    CPU embeddings from a sentence-transformers model stored on disk (e.g. bge-base-en-v1.5).
+    No network access is needed once the model directory is in place.
+    """
+
+    name = "local"
+
+    def __init__(self, model, batch_size=32):
+        super().__init__(model, batch_size)
+        if not model or not os.path.isdir(model):
+            raise RuntimeError(f"Local embedding model directory not found: {model}")
+
+        from sentence_transformers import SentenceTransformer
+
+        print(f"--- Loading local embedding model from: {model} ---")
+        self.client = SentenceTransformer(model, device="cpu")
+        self.dimension = self.client.get_sentence_embedding_dimension()
+
+    def _encode(self, texts):
+        vectors = self.client.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return vectors.tolist()
+
+    def embed_documents(self, texts):
+        return self._encode(list(texts))
+
+    def embed_query(self, text):
+        return self._encode([text])[0]
+
+
+PROVIDERS = {
+    GoogleEmbeddingProvider.name: GoogleEmbeddingProvider,
+    LocalEmbeddingProvider.name: LocalEmbeddingProvider,
+}
+
+
+def get_embedding_provider(index_name):
+    """Builds the embedding provider configured for the given index."""
+    settings = Config.embedding_config_for(index_name)
+    provider_cls = PROVIDERS.get(settings["provider"])
+    if not provider_cls:
+        raise ValueError(f"Unknown embedding provider: {settings['provider']}")
+    return provider_cls(model=settings.get("model"), batch_size=settings.get("batch_size", 32))
@@ -1,30 +1,68 @@
 import os
-import docx
-import pypdf
+from infrastructure.text_cache import TextCache
 
 class FileHandler:
     """
     Reads content from various file formats.
+    Text is produced page by page, so large PDFs never need their full text in memory.
+    PDF/DOCX text is served from the extracted-text cache when the file is unchanged.
     """
-    
+
+    SUPPORTED_FORMATS = ['.txt', '.md', '.docx', '.pdf']
+
+    @staticmethod
+    def _parse_pages(file_path):
+        """Yields (page_number, text). Non-PDF formats are a single page."""
+        ext = os.path.splitext(file_path)[1].lower()
+
+        if ext in ['.txt', '.md']:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                yield 1, f.read()
+        elif ext == '.docx':
+            import docx
+            doc = docx.Document(file_path)
+            yield 1, "\n".join([para.text for para in doc.paragraphs])
+        elif ext == '.pdf':
+            import pypdf
+            reader = pypdf.PdfReader(file_path)
+            for number, page in enumerate(reader.pages, start=1):
+                # Scanned/image-only pages have no text layer and may return None
+                yield number, page.extract_text() or ""
+        else:
+            raise ValueError(f"Unsupported file format: {ext}")
+
+    @staticmethod
+    def iter_pages(file_path):
+        """Yields (page_number, text) one page at a time. Raises on unreadable or unsupported files."""
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in TextCache.CACHED_FORMATS:
+            yield from TextCache.iter_pages(file_path, FileHandler._parse_pages)
+        else:
+            yield from FileHandler._parse_pages(file_path)
+
+    @staticmethod
+    def cached_page_count(file_path):
+        """Number of pages if it is known without parsing the file (text/Markdown, or a cached PDF/DOCX), else None."""
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in TextCache.CACHED_FORMATS:
+            return TextCache.page_count(file_path)
+        return 1
+
+    @staticmethod
+    def extract_text(file_path):
+        """Returns the text of a supported file. Raises on missing, unsupported or unreadable files."""
+        return "\n".join(text for _, text in FileHandler.iter_pages(file_path))
+
     @staticmethod
     def read_file(file_path):
         if not os.path.exists(file_path):
             return "Error: File not found."
-            
+
         ext = os.path.splitext(file_path)[1].lower()
-        
+        if ext not in FileHandler.SUPPORTED_FORMATS:
+            return f"Unsupported file format: {ext}"
+
         try:
-            if ext in ['.txt', '.md']:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    return f.read()
-            elif ext == '.docx':
-                doc = docx.Document(file_path)
-                return "\n".join([para.text for para in doc.paragraphs])
-            elif ext == '.pdf':
-                reader = pypdf.PdfReader(file_path)
-                return "\n".join([page.extract_text() for page in reader.pages])
-            else:
-                return f"Unsupported file format: {ext}"
+            return FileHandler.extract_text(file_path)
         except Exception as e:
-            return f"Error reading file: {str(e)}"
\ No newline at end of file
+            return f"Error reading file: {str(e)}"
@@ -0,0 +1,65 @@
+import os
+import json
+from datetime import datetime
+import pytz
+
+IST = pytz.timezone('Asia/Kolkata')
+MANIFEST_FILE = "manifest.json"
+# Bumped when the on-disk index layout changes incompatibly
+MANIFEST_FORMAT = 2
+
+
+class IndexManifest:
+    """
+    Small JSON file stored next to a FAISS index describing how it was built:
+    embedding provider, model and dimension, chunk parameters, per-document hashes,
+    chunk count and build time.
+    Startup validates an index against it alone, with no remote call and no test query.
+    """
+
+    @staticmethod
+    def path(index_dir):
+        return os.path.join(index_dir, MANIFEST_FILE)
+
+    @staticmethod
+    def load(index_dir):
+        """Returns the manifest dict, or None if the index has no (readable) manifest."""
+        try:
+            with open(IndexManifest.path(index_dir), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def write(index_dir, embedding_info, files, chunk_params, chunk_count):
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "embedding": embedding_info,
+            "chunking": chunk_params,
+            "chunk_count": chunk_count,
+            "document_count": len(files),
+            "files": files,
+            "built_at": datetime.now(IST).isoformat(),
+        }
+        with open(IndexManifest.path(index_dir), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    @staticmethod
+    def is_compatible(manifest, embedding_info, chunk_params):
+        """
+        True if the index was built in the current format, by the same provider and model,
+        with the same chunking. Dimension is only compared when both sides know it.
+        """
+        if not manifest or manifest.get("format") != MANIFEST_FORMAT:
+            return False
+        if manifest.get("chunking") != chunk_params:
+            return False
+        built_with = manifest.get("embedding", {})
+        if built_with.get("provider") != embedding_info.get("provider"):
+            return False
+        if built_with.get("model") != embedding_info.get("model"):
+            return False
+        if built_with.get("dimension") and embedding_info.get("dimension"):
+            return built_with["dimension"] == embedding_info["dimension"]
+        return True
@@ -1,29 +1,44 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
+import threading
 from core.constants import CHATBOT_SYSTEM_PROMPT, CLASSIFIER_PROMPT
 
 class LLMClient:
     """
     Wrapper for Gemini and RAG Chains.
     Includes safety checks for missing retrievers.
+    The retriever can be hot-swapped while queries are running.
+    The Gemini client and chains are built by load(), off the startup path
+    (in the warmup thread, or on first use), since it imports langchain.
     """
     
     def __init__(self, retriever):
-        self.llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", temperature=0.3)
+        self.llm = None
         self.retriever = retriever
-        
-        # Build chains (Safe initialization)
-        self.rag_chain = self._build_rag_chain()
-        self.classifier_chain = self._build_classifier_chain()
+        self.lock = threading.Lock()
+        self.rag_chain = None
+        self.classifier_chain = None
+
+    def load(self):
+        """Creates the Gemini client and builds the chains, once. Returns True."""
+        with self.lock:
+            if self.llm is None:
+                from langchain_google_genai import ChatGoogleGenerativeAI
+
+                self.llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", temperature=0.3)
+                # Build chains (Safe initialization)
+                self.rag_chain = self._build_rag_chain()
+                self.classifier_chain = self._build_classifier_chain()
+        return True
 
     def _build_rag_chain(self):
         # FIX: If retriever is missing (due to embedding error), return None instead of crashing
         if not self.retriever:
-            print("Warning: Retriever is None. RAG will be disabled.")
+            print("Warning: Retriever is None. RAG is disabled until an index is loaded.")
             return None
 
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.runnables import RunnablePassthrough
+        from langchain_core.output_parsers import StrOutputParser
+
         prompt = PromptTemplate.from_template(CHATBOT_SYSTEM_PROMPT)
         
         def format_docs(docs):
@@ -37,18 +52,36 @@ class LLMClient:
         )
 
     def _build_classifier_chain(self):
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.output_parsers import StrOutputParser
+
         prompt = PromptTemplate.from_template(CLASSIFIER_PROMPT)
         return prompt | self.llm | StrOutputParser()
 
+    def swap_retriever(self, retriever):
+        """
+        Replaces the retriever and rebuilds the RAG chain.
+        In-flight queries hold a reference to the old chain and finish on the old index.
+        """
+        with self.lock:
+            self.retriever = retriever
+            # Before load() there is no LLM yet; load() builds the chain with this retriever
+            if self.llm is not None:
+                self.rag_chain = self._build_rag_chain()
+
     def get_answer(self, query):
         """Gets the answer from the RAG chain."""
-        if not self.rag_chain:
+        self.load()
+        with self.lock:
+            rag_chain = self.rag_chain
+        if not rag_chain:
             return "System Error: Knowledge base failed to load. Please contact admin."
             
-        return self.rag_chain.invoke(query)
+        return rag_chain.invoke(query)
 
     def classify_query(self, query):
         """Classifies the query."""
+        self.load()
         try:
             category = self.classifier_chain.invoke({"query": query})
             clean = category.strip().replace(".", "")
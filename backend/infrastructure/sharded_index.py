@@ -0,0 +1,171 @@
+import os
+import shutil
+import threading
+from core.config import Config
+from core.constants import DOCUMENTS_DIR, FAISS_INDEX_DIR
+from infrastructure.embeddings import PROVIDERS
+from infrastructure.embedding_cache import EmbeddingCache
+from infrastructure.vector_store import VectorStoreManager, MAIN_FOLDER
+
+SHARDS_DIR = os.path.join(FAISS_INDEX_DIR, "shards")
+
+class ShardedIndexManager:
+    """
+    One FAISS index per top-level documents folder (plus the Main Folder for files at the root).
+    Each shard is built, loaded, versioned and swapped on its own, so changing one
+    department's documents never touches the other shards.
+    """
+
+    def __init__(self):
+        self.shards = {}
+        self.providers = {}
+        self.swap_listeners = []
+        self.retriever = None
+        self.lock = threading.Lock()
+        self.cache = EmbeddingCache()
+
+    @staticmethod
+    def list_folders():
+        """Main Folder plus every top-level subfolder of DOCUMENTS_DIR."""
+        folders = [MAIN_FOLDER]
+        if os.path.exists(DOCUMENTS_DIR):
+            for item in sorted(os.listdir(DOCUMENTS_DIR)):
+                if os.path.isdir(os.path.join(DOCUMENTS_DIR, item)):
+                    folders.append(item)
+        return folders
+
+    def _embeddings_for(self, folder):
+        """Embedding providers are shared between shards with the same settings."""
+        settings = Config.embedding_config_for(folder)
+        key = (settings["provider"], settings.get("model"), settings.get("batch_size"))
+        if key not in self.providers:
+            try:
+                provider_cls = PROVIDERS[settings["provider"]]
+                self.providers[key] = provider_cls(model=settings.get("model"), batch_size=settings.get("batch_size", 32))
+            except Exception as e:
+                print(f"CRITICAL ERROR: Embedding provider for '{folder}' failed to load: {e}")
+                self.providers[key] = None
+        return self.providers[key]
+
+    def _shard(self, folder):
+        with self.lock:
+            if folder not in self.shards:
+                shard = VectorStoreManager(
+                    index_dir=os.path.join(SHARDS_DIR, folder),
+                    folder=folder,
+                    embeddings=self._embeddings_for(folder),
+                    collect_garbage=False
+                )
+                shard.add_swap_listener(lambda _retriever: self._refresh_retriever())
+                self.shards[folder] = shard
+            return self.shards[folder]
+
+    def add_swap_listener(self, callback):
+        """Registers callback(retriever), called whenever any shard swaps to a new version."""
+        self.swap_listeners.append(callback)
+
+    def _refresh_retriever(self):
+        # Imported here so langchain isn't loaded until an index is
+        from infrastructure.sharded_retriever import ShardedRetriever
+
+        with self.lock:
+            vectorstores = [s.vectorstore for s in self.shards.values() if s.vectorstore]
+            self.retriever = ShardedRetriever(vectorstores=vectorstores, k=20) if vectorstores else None
+            retriever = self.retriever
+        for callback in self.swap_listeners:
+            callback(retriever)
+
+    def _drop_removed_shards(self, folders):
+        """Deletes shards whose folder no longer exists."""
+        on_disk = os.listdir(SHARDS_DIR) if os.path.isdir(SHARDS_DIR) else []
+        dropped = False
+        for folder in set(on_disk) | set(self.shards):
+            if folder not in folders:
+                with self.lock:
+                    dropped = self.shards.pop(folder, None) is not None or dropped
+                shutil.rmtree(os.path.join(SHARDS_DIR, folder), ignore_errors=True)
+                print(f"Removed index shard for deleted folder '{folder}'.")
+        if dropped:
+            self._refresh_retriever()
+
+    @staticmethod
+    def _remove_legacy_index():
+        """Deletes the single, unsharded index layout left by earlier versions."""
+        if os.path.exists(os.path.join(FAISS_INDEX_DIR, "current")):
+            shutil.rmtree(os.path.join(FAISS_INDEX_DIR, "versions"), ignore_errors=True)
+            os.remove(os.path.join(FAISS_INDEX_DIR, "current"))
+            print("Removed legacy unsharded FAISS index.")
+
+    def load_or_create_index(self):
+        """Loads (or builds) every shard and returns the fan-out retriever."""
+        folders = self.list_folders()
+        self._drop_removed_shards(folders)
+        for folder in folders:
+            self._shard(folder).load_or_create_index()
+        self._refresh_retriever()
+        if self.retriever:
+            self._remove_legacy_index()
+        return self.retriever
+
+    def update_index(self, progress=None, folder=None):
+        """
+        Applies document changes shard by shard; shards without changes are left untouched.
+        With folder set, only that shard is updated.
+        Returns the combined summary, or None if any shard failed.
+        """
+        folders = self.list_folders()
+        if folder is None:
+            self._drop_removed_shards(folders)
+            targets = folders
+        elif folder in folders:
+            targets = [folder]
+        else:
+            return None
+
+        summary = {"added": 0, "updated": 0, "removed": 0, "failed": [], "shards": {}}
+        ok = True
+        for number, name in enumerate(targets):
+            def shard_progress(stage, percent, number=number):
+                if progress:
+                    progress(stage, (number * 100 + percent) // len(targets))
+
+            result = self._shard(name).update_index(shard_progress)
+            summary["shards"][name] = "failed" if result is None else "ok"
+            if result is None:
+                ok = False
+                continue
+            for key in ("added", "updated", "removed"):
+                summary[key] += result[key]
+            summary["failed"].extend(result["failed"])
+
+        self.collect_cache_garbage()
+        return summary if ok else None
+
+    def rebuild_index(self, progress=None, folder=None):
+        """Forces a full rebuild of one shard, or of all of them."""
+        targets = [folder] if folder else self.list_folders()
+        ok = True
+        for number, name in enumerate(targets):
+            def shard_progress(stage, percent, number=number):
+                if progress:
+                    progress(stage, (number * 100 + percent) // len(targets))
+            ok = self._shard(name).rebuild_index(shard_progress) and ok
+        self.collect_cache_garbage()
+        return ok
+
+    def rollback(self, version=None, folder=MAIN_FOLDER):
+        """Rolls one shard back to an earlier version."""
+        if folder not in self.shards:
+            return None
+        return self.shards[folder].rollback(version)
+
+    def collect_cache_garbage(self):
+        """Drops cached vectors that no kept version of any shard references."""
+        referenced = set()
+        for shard in list(self.shards.values()):
+            referenced |= shard.referenced_chunks()
+        try:
+            return self.cache.collect_garbage(referenced)
+        except Exception as e:
+            print(f"Embedding cache cleanup failed: {e}")
+            return 0
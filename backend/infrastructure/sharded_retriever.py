@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.retrievers import BaseRetriever
+
+# Shared by all queries; FAISS releases the GIL while searching
+_search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="shard-search")
+
+
+class ShardedRetriever(BaseRetriever):
+    """
+    Searches every shard in parallel and merges the hits into one top-k list.
+    The query is embedded once per distinct embedding provider.
+    Scores are FAISS L2 distances, so the merge assumes shards sharing a provider/model.
+    """
+
+    vectorstores: list
+    k: int = 20
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        if not self.vectorstores:
+            return []
+
+        query_vectors = {}
+        for vectorstore in self.vectorstores:
+            key = id(vectorstore.embeddings)
+            if key not in query_vectors:
+                query_vectors[key] = vectorstore.embeddings.embed_query(query)
+
+        def search(vectorstore):
+            return vectorstore.similarity_search_with_score_by_vector(query_vectors[id(vectorstore.embeddings)], k=self.k)
+
+        hits = [
+            hit for shard_hits in _search_pool.map(search, self.vectorstores) for hit in shard_hits
+            # Skip the placeholder chunk of empty shards
+            if hit[0].metadata.get("source") != "system"
+        ]
+        hits.sort(key=lambda hit: hit[1])  # Smaller distance is closer
+        return [doc for doc, _ in hits[:self.k]]
@@ -0,0 +1,130 @@
+import os
+import json
+import gzip
+import hashlib
+import threading
+from core.constants import TEXT_CACHE_DIR
+
+
+class TextCache:
+    """
+    On-disk cache of text extracted from PDF/DOCX files.
+    Each file gets a small JSON metadata entry and its pages as gzip-compressed NDJSON,
+    so cached text can be streamed page by page without loading the whole document.
+    An entry is valid while the file's mtime and size match; if they changed but the
+    content hash did not (e.g. the file was re-copied), the pages are reused and the
+    metadata refreshed.
+    Shared by the editor preview, FileHandler and the indexer's worker processes.
+    """
+
+    CACHED_FORMATS = ['.pdf', '.docx']
+
+    @staticmethod
+    def _entry_paths(file_path):
+        key = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+        base = os.path.join(TEXT_CACHE_DIR, key)
+        return base + ".json", base + ".ndjson.gz"
+
+    @staticmethod
+    def _hash_file(file_path):
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _tmp_name(path):
+        # Unique per process and thread: several indexer workers may write at once
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    @staticmethod
+    def _read_meta(meta_path):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_meta(meta_path, meta):
+        tmp_path = TextCache._tmp_name(meta_path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    @staticmethod
+    def _read_pages(pages_path):
+        with gzip.open(pages_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                page = json.loads(line)
+                yield page["page"], page["text"]
+
+    @staticmethod
+    def iter_pages(file_path, extractor):
+        """
+        Yields (page_number, text) for file_path from the cache.
+        On a miss, pages come from extractor(file_path) and are cached as they stream;
+        the entry is only committed if the whole document was read.
+        """
+        stat = os.stat(file_path)
+        meta_path, pages_path = TextCache._entry_paths(file_path)
+        meta = TextCache._read_meta(meta_path)
+
+        if meta and os.path.exists(pages_path):
+            if meta["mtime"] == stat.st_mtime and meta["size"] == stat.st_size:
+                yield from TextCache._read_pages(pages_path)
+                return
+            content_hash = TextCache._hash_file(file_path)
+            if meta["content_hash"] == content_hash:
+                meta.update(mtime=stat.st_mtime, size=stat.st_size)
+                TextCache._write_meta(meta_path, meta)
+                yield from TextCache._read_pages(pages_path)
+                return
+        else:
+            content_hash = TextCache._hash_file(file_path)
+
+        os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+        tmp_path = TextCache._tmp_name(pages_path)
+        complete = False
+        page_count = 0
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                for number, text in extractor(file_path):
+                    f.write(json.dumps({"page": number, "text": text}) + "\n")
+                    page_count = number
+                    yield number, text
+            complete = True
+        finally:
+            try:
+                if complete:
+                    os.replace(tmp_path, pages_path)
+                    TextCache._write_meta(meta_path, {
+                        "path": os.path.abspath(file_path),
+                        "mtime": stat.st_mtime,
+                        "size": stat.st_size,
+                        "content_hash": content_hash,
+                        "page_count": page_count,
+                    })
+                else:
+                    os.remove(tmp_path)
+            except OSError as e:
+                print(f"Failed to cache text for {file_path}: {e}")
+
+    @staticmethod
+    def page_count(file_path):
+        """Page count recorded with a valid cache entry for file_path, or None if there is none."""
+        stat = os.stat(file_path)
+        meta_path, pages_path = TextCache._entry_paths(file_path)
+        meta = TextCache._read_meta(meta_path)
+        if meta and meta["mtime"] == stat.st_mtime and meta["size"] == stat.st_size and os.path.exists(pages_path):
+            return meta.get("page_count")
+        return None
+
+    @staticmethod
+    def invalidate(file_path):
+        for path in TextCache._entry_paths(file_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
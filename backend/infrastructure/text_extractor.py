@@ -0,0 +1,100 @@
+import os
+import time
+import multiprocessing
+from core.config import Config
+from infrastructure.file_handler import FileHandler
+
+# Builds run on a background thread of the threaded server, which holds SQLite connections and
+# gRPC/Google clients; forking such a process can deadlock the children, so workers are spawned
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _extract(path):
+    """
+    Runs inside a worker process. Returns a list of {"page_content", "metadata"} dicts,
+    one per non-empty page, so chunks carry the page they came from.
+    Formats FileHandler knows are parsed directly; anything else goes through unstructured.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in FileHandler.SUPPORTED_FORMATS:
+        return [
+            {"page_content": text, "metadata": {"source": path, "page": number}}
+            for number, text in FileHandler.iter_pages(path)
+            if text.strip()
+        ]
+
+    from langchain_community.document_loaders import UnstructuredFileLoader
+    return [{"page_content": d.page_content, "metadata": d.metadata} for d in UnstructuredFileLoader(path).load()]
+
+
+class TextExtractor:
+    """
+    Extracts document text on a process pool, so PDF/DOCX parsing scales with cores
+    instead of being serialized by the GIL.
+    - At most one file per worker is in flight, so each file's timeout starts when it does.
+    - A file that times out has its worker killed; the pool is restarted for the rest.
+    - Failures are reported per file instead of being silently dropped.
+    - The pool is never larger than the number of files left, and a single file is parsed
+      in-process, since spawning a worker costs more than parsing one document.
+    """
+
+    def __init__(self, workers=None, timeout=None):
+        self.workers = workers or Config.EXTRACTION_WORKERS
+        self.timeout = timeout or Config.EXTRACTION_TIMEOUT
+
+    def extract(self, paths):
+        """
+        Yields (path, documents, error) as files finish, in completion order.
+        documents is a list of dicts on success and None on failure.
+        """
+        queue = list(paths)
+        if not queue:
+            return
+        if len(queue) == 1:
+            path = queue[0]
+            try:
+                documents = _extract(path)
+            except Exception as e:
+                yield path, None, f"{type(e).__name__}: {e}"
+            else:
+                yield path, documents, None
+            return
+        queue.reverse()
+        size = min(self.workers, len(queue))
+        pool = _MP_CONTEXT.Pool(size)
+        in_flight = {}
+
+        try:
+            while queue or in_flight:
+                while queue and len(in_flight) < size:
+                    path = queue.pop()
+                    in_flight[path] = (pool.apply_async(_extract, (path,)), time.monotonic())
+
+                timed_out = []
+                for path, (result, started) in list(in_flight.items()):
+                    if result.ready():
+                        del in_flight[path]
+                        try:
+                            yield path, result.get(), None
+                        except Exception as e:
+                            yield path, None, f"{type(e).__name__}: {e}"
+                    elif time.monotonic() - started > self.timeout:
+                        timed_out.append(path)
+
+                if timed_out:
+                    # A stuck parser can't be cancelled, only killed with its pool
+                    pool.terminate()
+                    for path in timed_out:
+                        del in_flight[path]
+                    # Restart the other interrupted files on the new pool
+                    queue.extend(in_flight)
+                    in_flight = {}
+                    if queue:
+                        size = min(self.workers, len(queue))
+                        pool = _MP_CONTEXT.Pool(size)
+                    for path in timed_out:
+                        yield path, None, f"Timed out after {self.timeout}s"
+                elif in_flight:
+                    time.sleep(0.05)
+        finally:
+            pool.terminate()
@@ -1,102 +1,419 @@
 import os
 import shutil
-import time
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.document_loaders import DirectoryLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import hashlib
+import threading
+from datetime import datetime
+import pytz
+from core.config import Config
 from core.constants import DOCUMENTS_DIR, FAISS_INDEX_DIR
+from infrastructure.embeddings import get_embedding_provider
+from infrastructure.index_manifest import IndexManifest
+from infrastructure.embedding_pipeline import EmbeddingPipeline
+from infrastructure.embedding_cache import EmbeddingCache
+from infrastructure.text_extractor import TextExtractor
+
+IST = pytz.timezone('Asia/Kolkata')
+CHUNK_SIZE = 2000
+CHUNK_OVERLAP = 300
+CHUNK_PARAMS = {"chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
+
+MAIN_FOLDER = "Main Folder"
 
 class VectorStoreManager:
     """
-    Manages the FAISS Vector Store.
-    Updated to use the latest stable Google Embedding models.
+    Manages one FAISS Vector Store (one shard when used through ShardedIndexManager).
+    The embedding backend (Google API or a local CPU model) is chosen per index
+    through Config.embedding_config_for().
+    The manifest tracks every document's content hash and chunk vector IDs,
+    so edits are applied incrementally instead of re-embedding the corpus.
+    Builds are published as versions and swapped in atomically.
     """
-    
-    def __init__(self):
-        # We try 'models/text-embedding-004' first (Latest Standard)
-        # If that fails, we try 'models/gemini-embedding-001' (What you found)
-        self.model_candidates = [
-            "models/text-embedding-004",
-            "models/gemini-embedding-001"
-        ]
-        self.embeddings = self._initialize_embeddings()
+
+    def __init__(self, index_dir=FAISS_INDEX_DIR, folder=None, embeddings=None, collect_garbage=True):
+        self.index_dir = index_dir
+        self.index_name = os.path.basename(index_dir)
+        # Top-level documents folder this index covers; None means the whole DOCUMENTS_DIR
+        self.folder = folder
+        # Sharded indexes share the embedding cache, so garbage collection is run across all shards instead
+        self.collect_garbage = collect_garbage
+        self.embeddings = embeddings or self._initialize_embeddings()
         self.vectorstore = None
         self.retriever = None
+        self.files = {}
+        self.swap_listeners = []
+        # Files that failed to parse in the last build, as [{"file", "error"}]
+        self.last_failures = []
+        self.lock = threading.Lock()
+        self.build_lock = threading.RLock()
+        self.cache = EmbeddingCache()
+        self.splitter = None
 
     def _initialize_embeddings(self):
-        """Tries to load a working embedding model."""
-        for model in self.model_candidates:
-            try:
-                print(f"--- Attempting to load model: {model} ---")
-                embeddings = GoogleGenerativeAIEmbeddings(model=model)
-                # Test connection immediately
-                embeddings.embed_query("test")
-                print(f"Success! Using: {model}")
-                return embeddings
-            except Exception as e:
-                print(f"Model {model} failed: {e}")
-        
-        print("CRITICAL ERROR: No embedding models worked. Check API Key.")
-        return None
+        """Loads the embedding provider configured for this index."""
+        try:
+            return get_embedding_provider(self.index_name)
+        except Exception as e:
+            print(f"CRITICAL ERROR: Embedding provider failed to load: {e}")
+            return None
 
     def load_or_create_index(self):
-        """Loads existing index or creates a new one."""
+        """Loads the current index version or creates a new one."""
         if not self.embeddings:
             return None
 
-        if os.path.exists(FAISS_INDEX_DIR):
-            try:
-                print("Loading FAISS index...")
-                self.vectorstore = FAISS.load_local(FAISS_INDEX_DIR, self.embeddings, allow_dangerous_deserialization=True)
-                # Self-Test to ensure index matches model
-                self.vectorstore.similarity_search("test", k=1)
-            except Exception:
-                print("Index is incompatible or corrupt. Rebuilding...")
-                self.rebuild_index()
+        version = self.current_version()
+        loaded = self._load_version(version) if version else None
+        if loaded:
+            print(f"Loaded FAISS index version {version}.")
+            self._activate(*loaded)
+        elif version:
+            print("Current index is incompatible or corrupt. Rebuilding...")
+            self.rebuild_index()
         else:
             self.create_index()
-        
-        if self.vectorstore:
-            self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 20})
         return self.retriever
 
-    def create_index(self):
-        """Reads documents and builds a new FAISS index."""
-        if not self.embeddings:
-            return
-
-        print("Creating new FAISS index...")
-        if not os.path.exists(DOCUMENTS_DIR):
-            os.makedirs(DOCUMENTS_DIR)
-
-        loader = DirectoryLoader(DOCUMENTS_DIR, glob="**/*.*", show_progress=True, use_multithreading=True, silent_errors=True)
-        docs = loader.load()
-        
-        if not docs:
-            print("No documents found. Creating empty index.")
-            from langchain_core.documents import Document
-            docs = [Document(page_content="Welcome to BIT Chatbot.", metadata={"source": "system"})]
-
-        splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=300)
-        texts = splitter.split_documents(docs)
-        
+    # --- Versions ---
+    # Each build is saved to versions/<version>/ and validated before the
+    # 'current' pointer file is swapped to it. Older versions are kept for rollback.
+
+    def _version_path(self, version):
+        return os.path.join(self.index_dir, "versions", version)
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.index_dir, "current"), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def list_versions(self):
+        """Completed index versions, newest first."""
+        versions_dir = os.path.join(self.index_dir, "versions")
+        if not os.path.isdir(versions_dir):
+            return []
+        return sorted((v for v in os.listdir(versions_dir) if not v.endswith(".tmp")), reverse=True)
+
+    def add_swap_listener(self, callback):
+        """Registers callback(retriever), called whenever a new index version goes live."""
+        self.swap_listeners.append(callback)
+
+    def _load_version(self, version):
+        """Returns (vectorstore, manifest) for a version, or None if it can't be used."""
+        from langchain_community.vectorstores import FAISS
+
+        path = self._version_path(version)
+        # Validated from the manifest alone: no test query, no remote call
+        manifest = IndexManifest.load(path)
+        if manifest:
+            self.embeddings.adopt(manifest.get("embedding", {}))
+        if not IndexManifest.is_compatible(manifest, self.embeddings.describe(), CHUNK_PARAMS):
+            return None
+        try:
+            vectorstore = FAISS.load_local(path, self.embeddings, allow_dangerous_deserialization=True)
+        except Exception as e:
+            print(f"Failed to load index version {version}: {e}")
+            return None
+        return vectorstore, manifest
+
+    @staticmethod
+    def _validate(vectorstore, manifest):
+        """Sanity checks a freshly written index before it is allowed to go live."""
+        if vectorstore.index.ntotal == 0:
+            raise ValueError("Index is empty")
+        if vectorstore.index.ntotal != len(vectorstore.index_to_docstore_id):
+            raise ValueError("Index and docstore are out of sync")
+        dimension = manifest["embedding"].get("dimension")
+        if dimension and vectorstore.index.d != dimension:
+            raise ValueError(f"Index dimension {vectorstore.index.d} does not match model dimension {dimension}")
+
+    def _activate(self, vectorstore, manifest):
+        """
+        Makes a vectorstore live. Queries already running keep their reference
+        to the previous index and finish on it.
+        """
+        with self.lock:
+            self.vectorstore = vectorstore
+            self.files = manifest.get("files", {})
+            self.retriever = vectorstore.as_retriever(search_kwargs={"k": 20})
+        for callback in self.swap_listeners:
+            callback(self.retriever)
+
+    def _write_pointer(self, version):
+        pointer = os.path.join(self.index_dir, "current")
+        with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer + ".tmp", pointer)
+
+    def _publish(self, vectorstore, files):
+        """Saves a new version, validates it from disk, swaps 'current' to it and prunes old versions."""
+        from langchain_community.vectorstores import FAISS
+
+        version = datetime.now(IST).strftime("%Y%m%d-%H%M%S-%f")
+        tmp_dir = self._version_path(version) + ".tmp"
+        vectorstore.save_local(tmp_dir)
+        IndexManifest.write(tmp_dir, self.embeddings.describe(), files, CHUNK_PARAMS,
+                            chunk_count=vectorstore.index.ntotal)
+
+        manifest = IndexManifest.load(tmp_dir)
+        reloaded = FAISS.load_local(tmp_dir, self.embeddings, allow_dangerous_deserialization=True)
+        self._validate(reloaded, manifest)
+
+        os.replace(tmp_dir, self._version_path(version))
+        self._write_pointer(version)
+        self._activate(reloaded, manifest)
+        self._prune()
+        return version
+
+    def _prune(self):
+        current = self.current_version()
+        for version in self.list_versions()[Config.INDEX_VERSIONS_TO_KEEP:]:
+            if version != current:
+                shutil.rmtree(self._version_path(version), ignore_errors=True)
+        if self.collect_garbage:
+            self.collect_cache_garbage()
+
+    def referenced_chunks(self):
+        """(model, chunk hash) pairs used by any index version still on disk."""
+        referenced = set()
+        for version in self.list_versions():
+            manifest = IndexManifest.load(self._version_path(version))
+            if not manifest:
+                continue
+            model = EmbeddingCache.model_key(manifest.get("embedding", {}))
+            for entry in manifest.get("files", {}).values():
+                referenced.update((model, h) for h in entry.get("chunk_hashes", []))
+        return referenced
+
+    def collect_cache_garbage(self):
+        """Drops cached vectors that no kept index version references anymore."""
         try:
-            self.vectorstore = FAISS.from_documents(texts, self.embeddings)
-            self.vectorstore.save_local(FAISS_INDEX_DIR)
-            print("Index created successfully.")
+            return self.cache.collect_garbage(self.referenced_chunks())
         except Exception as e:
-            print(f"Failed to create index: {e}")
+            print(f"Embedding cache cleanup failed: {e}")
+            return 0
+
+    def rollback(self, version=None):
+        """
+        Points 'current' back to an earlier version (the one before the current by default)
+        and swaps it in. Returns the version now live, or None if there was nothing to roll back to.
+        """
+        with self.build_lock:
+            versions = self.list_versions()
+            current = self.current_version()
+            if version is None:
+                older = [v for v in versions if current is None or v < current]
+                version = older[0] if older else None
+            if not version or version not in versions:
+                return None
+
+            loaded = self._load_version(version)
+            if not loaded:
+                return None
+            self._write_pointer(version)
+            self._activate(*loaded)
+            print(f"Rolled back index to version {version}.")
+            return version
+
+    # --- Document scanning ---
+
+    @staticmethod
+    def _hash_file(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _scan_documents(self):
+        """
+        Returns {relative path: content hash} for every file this index covers.
+        Paths are relative to DOCUMENTS_DIR. The main folder only covers files at the top level.
+        """
+        os.makedirs(DOCUMENTS_DIR, exist_ok=True)
+        scan_dir = DOCUMENTS_DIR if self.folder in (None, MAIN_FOLDER) else os.path.join(DOCUMENTS_DIR, self.folder)
+        found = {}
+        for root, dirs, filenames in os.walk(scan_dir):
+            if self.folder == MAIN_FOLDER:
+                dirs.clear()
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                rel_path = os.path.relpath(path, DOCUMENTS_DIR).replace("\\", "/")
+                try:
+                    found[rel_path] = self._hash_file(path)
+                except OSError as e:
+                    print(f"Skipping unreadable file {rel_path}: {e}")
+        return found
+
+    def _split(self, rel_path, content_hash, docs):
+        """Splits one file's documents. Chunk IDs are derived from the path and content hash."""
+        if self.splitter is None:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+            self.splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        chunks = self.splitter.split_documents(docs)
+        prefix = hashlib.sha1(rel_path.encode("utf-8")).hexdigest()[:12]
+        for number, chunk in enumerate(chunks):
+            chunk.id = f"{prefix}-{content_hash[:12]}-{number}"
+        return chunks
+
+    def _embed_files(self, documents, progress=None):
+        """
+        Parses, splits and embeds the given {relative path: hash} files.
+        Returns the chunks, their vectors, the manifest entries for those files
+        and the files that failed to parse.
+        """
+        from langchain_core.documents import Document
+
+        report = progress or (lambda stage, percent: None)
+        total = max(len(documents), 1)
+
+        # Documents stream from the extraction pool straight into the splitter
+        report("parsing", 0)
+        chunks = []
+        entries = {}
+        failures = []
+        paths = {os.path.join(DOCUMENTS_DIR, rel_path): rel_path for rel_path in documents}
+        for done, (path, docs, error) in enumerate(TextExtractor().extract(paths), start=1):
+            rel_path = paths[path]
+            if error:
+                # Left out of the manifest so the next update retries it
+                print(f"Failed to parse {rel_path}: {error}")
+                failures.append({"file": rel_path, "error": error})
+            else:
+                docs = [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in docs]
+                file_chunks = self._split(rel_path, documents[rel_path], docs)
+                chunks.extend(file_chunks)
+                entries[rel_path] = {
+                    "hash": documents[rel_path],
+                    "ids": [c.id for c in file_chunks],
+                    # Lets cache garbage collection know which vectors this version still uses
+                    "chunk_hashes": [EmbeddingCache.text_hash(c.page_content) for c in file_chunks],
+                }
+            report("parsing" if done < total else "chunking", 30 * done // total)
+
+        report("embedding", 35)
+        vectors = EmbeddingPipeline(self.embeddings, cache=self.cache).embed(
+            [c.page_content for c in chunks],
+            progress_callback=lambda done, batches: report("embedding", 35 + 55 * done // batches)
+        )
+        return chunks, vectors, entries, failures
+
+    # --- Building & updating ---
+
+    def _placeholder(self):
+        """Single welcome chunk used when there are no documents, since an index can't be empty."""
+        from langchain_core.documents import Document
+
+        chunks = [Document(page_content="Welcome to BIT Chatbot.", metadata={"source": "system"}, id="system-0")]
+        return chunks, self.embeddings.embed_documents([chunks[0].page_content])
+
+    def create_index(self, progress=None):
+        """
+        Reads documents and builds a new FAISS index version.
+        The live index keeps serving until the new one is validated and swapped in.
+        progress(stage, percent) is called as the build moves through
+        parsing, chunking, embedding and saving.
+        """
+        if not self.embeddings:
+            return False
+        from langchain_community.vectorstores import FAISS
+
+        with self.build_lock:
+            print("Creating new FAISS index...")
+            documents = self._scan_documents()
 
-    def rebuild_index(self):
-        """Forces a rebuild."""
-        if os.path.exists(FAISS_INDEX_DIR):
             try:
-                shutil.rmtree(FAISS_INDEX_DIR)
-                time.sleep(1) # Wait for file lock release
-            except Exception:
-                pass
-        self.create_index()
-        if self.vectorstore:
-            self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 20})
-        return True
\ No newline at end of file
+                self.embeddings.ensure_ready()
+                chunks, vectors, entries, self.last_failures = self._embed_files(documents, progress)
+                if not chunks:
+                    print("No documents found. Creating empty index.")
+                    chunks, vectors = self._placeholder()
+
+                if progress:
+                    progress("saving", 90)
+                vectorstore = FAISS.from_embeddings(
+                    [(c.page_content, v) for c, v in zip(chunks, vectors)], self.embeddings,
+                    metadatas=[c.metadata for c in chunks], ids=[c.id for c in chunks]
+                )
+                version = self._publish(vectorstore, entries)
+                print(f"Index version {version} created successfully.")
+                return True
+            except Exception as e:
+                print(f"Failed to create index: {e}")
+                return False
+
+    def update_index(self, progress=None):
+        """
+        Applies document changes incrementally: only new or modified files are re-embedded,
+        and vectors of modified or deleted files are removed from the index.
+        Changes are applied to a fresh copy of the current version, which is then published
+        as a new version; the live index is never modified in place.
+        Falls back to a full build if there is no index loaded yet.
+        Returns a summary dict, or None if the update failed.
+        """
+        if not self.embeddings:
+            return None
+        if not self.vectorstore:
+            if not self.rebuild_index(progress):
+                return None
+            return {"added": len(self.files), "updated": 0, "removed": 0, "failed": self.last_failures}
+
+        from langchain_community.vectorstores import FAISS
+
+        with self.build_lock:
+            files = dict(self.files)
+            current = self._scan_documents()
+            added = {p: h for p, h in current.items() if p not in files}
+            updated = {p: h for p, h in current.items() if p in files and files[p]["hash"] != h}
+            removed = [p for p in files if p not in current]
+
+            if not (added or updated or removed):
+                print("Index is up to date.")
+                return {"added": 0, "updated": 0, "removed": 0, "failed": []}
+
+            try:
+                self.embeddings.ensure_ready()
+                chunks, vectors, entries, self.last_failures = self._embed_files({**added, **updated}, progress)
+                if progress:
+                    progress("saving", 90)
+
+                working = FAISS.load_local(self._version_path(self.current_version()), self.embeddings,
+                                           allow_dangerous_deserialization=True)
+                # Only IDs still in the index; an entry may predate a partial earlier update
+                present = set(working.index_to_docstore_id.values())
+                stale_ids = [i for p in list(updated) + removed for i in files[p]["ids"] if i in present]
+                if stale_ids:
+                    working.delete(stale_ids)
+                if chunks:
+                    working.add_embeddings(
+                        [(c.page_content, v) for c, v in zip(chunks, vectors)],
+                        metadatas=[c.metadata for c in chunks], ids=[c.id for c in chunks]
+                    )
+
+                if working.index.ntotal == 0:
+                    # Every document was removed; keep the index non-empty
+                    placeholder, placeholder_vectors = self._placeholder()
+                    working.add_embeddings(
+                        [(c.page_content, v) for c, v in zip(placeholder, placeholder_vectors)],
+                        metadatas=[c.metadata for c in placeholder], ids=[c.id for c in placeholder]
+                    )
+
+                # Modified files that failed to re-embed lost their vectors above; dropping their
+                # entries makes the next update treat them as new instead of deleting again
+                for rel_path in removed + [p for p in updated if p not in entries]:
+                    del files[rel_path]
+                files.update(entries)
+                self._publish(working, files)
+            except Exception as e:
+                print(f"Failed to update index: {e}")
+                return None
+
+        print(f"Index updated: {len(added)} added, {len(updated)} updated, {len(removed)} removed.")
+        failed = {f["file"] for f in self.last_failures}
+        return {"added": len(added) - len(failed & set(added)),
+                "updated": len(updated) - len(failed & set(updated)),
+                "removed": len(removed), "failed": self.last_failures}
+
+    def rebuild_index(self, progress=None):
+        """Forces a full rebuild as a new version; the current one stays live until the swap."""
+        return self.create_index(progress)
@@ -0,0 +1,52 @@
+import time
+import threading
+
+
+class Warmup:
+    """
+    Runs slow startup work (embedding model, FAISS shards) in a background thread
+    so the app can serve requests that don't need the knowledge base right away.
+    """
+
+    def __init__(self):
+        self.finished = threading.Event()
+        self.state = "starting"
+        self.error = None
+        self.started = time.monotonic()
+        self.elapsed = None
+
+    def start(self, target):
+        """Runs target() in the background. A falsy result marks the warmup as failed."""
+        threading.Thread(target=self._run, args=(target,), name="warmup", daemon=True).start()
+
+    def _run(self, target):
+        try:
+            if target():
+                self.state = "ready"
+            else:
+                self.state = "failed"
+                self.error = "Knowledge base failed to load"
+        except Exception as e:
+            print(f"Startup warmup failed: {e}")
+            self.state = "failed"
+            self.error = str(e)
+        finally:
+            self.elapsed = round(time.monotonic() - self.started, 1)
+            self.finished.set()
+            print(f"--- AI Components {self.state} after {self.elapsed}s ---")
+
+    @property
+    def is_ready(self):
+        return self.state == "ready"
+
+    def wait(self, timeout):
+        """Waits up to timeout seconds for warmup to finish. Returns True if it is ready."""
+        self.finished.wait(timeout)
+        return self.is_ready
+
+    def status(self):
+        return {
+            "status": self.state,
+            "elapsed_seconds": self.elapsed if self.elapsed is not None else round(time.monotonic() - self.started, 1),
+            "error": self.error,
+        }
@@ -1,7 +1,9 @@
 from api import create_app
 from core.config import Config
 
-app = create_app()
+# Spawned worker processes (index text extraction) re-import this file as __mp_main__ and must not start the app
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     print(f"\n--- BIT Chatbot Backend Started on Port {Config.PORT} ---")
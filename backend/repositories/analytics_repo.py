@@ -0,0 +1,181 @@
+from datetime import timedelta
+from repositories.connection import connect
+from repositories.timestamps import IST_OFFSET_SECONDS
+
+# Most source rows folded in per transaction, so a first backfill over all history
+# doesn't hold the write lock (and block chat inserts) for the whole run
+ROLLUP_BATCH = 20000
+
+class AnalyticsRepository:
+    """
+    Hourly and daily rollups of chat and escalation activity (migration 10).
+    refresh() folds in only rows added (or resolved) since the last run, tracked by watermarks;
+    reads never touch chat_history or escalated_queries.
+    """
+
+    # granularity -> strftime format of its (IST) bucket name, applied to the epoch columns in SQL
+    GRANULARITIES = {"hour": "%Y-%m-%dT%H", "day": "%Y-%m-%d"}
+
+    @staticmethod
+    def _bucket_sql(granularity, column):
+        return f"strftime('{AnalyticsRepository.GRANULARITIES[granularity]}', {column} + {IST_OFFSET_SECONDS}, 'unixepoch')"
+
+    @staticmethod
+    def _watermark(conn, source, default):
+        row = conn.execute("SELECT position FROM analytics_watermarks WHERE source = ?", (source,)).fetchone()
+        return row["position"] if row else default
+
+    @staticmethod
+    def _set_watermark(conn, source, position):
+        conn.execute("""
+            INSERT INTO analytics_watermarks (source, position) VALUES (?, ?)
+            ON CONFLICT (source) DO UPDATE SET position = excluded.position
+        """, (source, str(position)))
+
+    @staticmethod
+    def _roll_up_inserts(conn, table, counter, with_users):
+        """Adds up to ROLLUP_BATCH ids of `table` past the watermark to the `counter` column of the rollups."""
+        last_id = int(AnalyticsRepository._watermark(conn, table, 0))
+        max_id = conn.execute(f"SELECT IFNULL(MAX(id), 0) FROM {table}").fetchone()[0]
+        max_id = min(max_id, last_id + ROLLUP_BATCH)
+        if max_id <= last_id:
+            return 0
+
+        for granularity in AnalyticsRepository.GRANULARITIES:
+            bucket = AnalyticsRepository._bucket_sql(granularity, "timestamp_epoch")
+            conn.execute(f"""
+                INSERT INTO analytics_rollups (granularity, bucket, category, {counter})
+                SELECT ?, {bucket}, IFNULL(category, 'Uncategorized'), COUNT(*)
+                FROM {table}
+                WHERE id > ? AND id <= ?
+                GROUP BY 2, 3
+                ON CONFLICT (granularity, bucket, category) DO UPDATE SET {counter} = {counter} + excluded.{counter}
+            """, (granularity, last_id, max_id))
+            if with_users:
+                conn.execute(f"""
+                    INSERT OR IGNORE INTO analytics_active_users (granularity, bucket, phone_number)
+                    SELECT DISTINCT ?, {bucket}, phone_number
+                    FROM {table}
+                    WHERE id > ? AND id <= ? AND phone_number IS NOT NULL AND phone_number != 'N/A'
+                """, (granularity, last_id, max_id))
+        AnalyticsRepository._set_watermark(conn, table, max_id)
+        return max_id - last_id
+
+    @staticmethod
+    def _roll_up_resolutions(conn):
+        """
+        Adds escalations resolved since the watermark (about ROLLUP_BATCH at a time), bucketed by when
+        they were resolved. resolved_epoch is set once per escalation, so none is counted twice.
+        Only whole seconds that are over are taken: resolved_epoch is stamped by SQLite while the
+        resolving UPDATE holds the write lock (held here too), so an unfinished second can still
+        gain rows, but an earlier one can't.
+        """
+        last = int(AnalyticsRepository._watermark(conn, "resolutions", 0))
+        settled = conn.execute("SELECT CAST(strftime('%s', 'now') AS INTEGER) - 1").fetchone()[0]
+        newest = conn.execute("""
+            SELECT MAX(resolved_epoch) FROM (
+                SELECT resolved_epoch FROM escalated_queries
+                WHERE resolved_epoch > ? AND resolved_epoch <= ?
+                ORDER BY resolved_epoch LIMIT ?
+            )
+        """, (last, settled, ROLLUP_BATCH)).fetchone()[0]
+        if newest is None:
+            return 0
+
+        for granularity in AnalyticsRepository.GRANULARITIES:
+            conn.execute(f"""
+                INSERT INTO analytics_rollups (granularity, bucket, category, resolved, resolution_seconds)
+                SELECT ?, {AnalyticsRepository._bucket_sql(granularity, "resolved_epoch")}, IFNULL(category, 'Uncategorized'),
+                       COUNT(*), SUM(resolved_epoch - timestamp_epoch)
+                FROM escalated_queries
+                WHERE resolved_epoch > ? AND resolved_epoch <= ?
+                GROUP BY 2, 3
+                ON CONFLICT (granularity, bucket, category) DO UPDATE SET
+                    resolved = resolved + excluded.resolved,
+                    resolution_seconds = resolution_seconds + excluded.resolution_seconds
+            """, (granularity, last, newest))
+        count = conn.execute("SELECT COUNT(*) FROM escalated_queries WHERE resolved_epoch > ? AND resolved_epoch <= ?",
+                             (last, newest)).fetchone()[0]
+        AnalyticsRepository._set_watermark(conn, "resolutions", newest)
+        return count
+
+    @staticmethod
+    def refresh():
+        """
+        Folds new chats, escalations and resolutions into the rollups, one batch per transaction
+        until caught up. Returns rows processed per source.
+        """
+        conn = connect()
+        processed = {"chats": 0, "escalations": 0, "resolutions": 0}
+        while True:
+            # IMMEDIATE: concurrent refreshes (scheduled and on-read) queue up instead of double counting
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                batch = {
+                    "chats": AnalyticsRepository._roll_up_inserts(conn, "chat_history", "queries", with_users=True),
+                    "escalations": AnalyticsRepository._roll_up_inserts(conn, "escalated_queries", "escalations", with_users=False),
+                    "resolutions": AnalyticsRepository._roll_up_resolutions(conn),
+                }
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            if not any(batch.values()):
+                return processed
+            for source, count in batch.items():
+                processed[source] += count
+
+    @staticmethod
+    def bucket_range(start, end):
+        """Inclusive YYYY-MM-DD dates -> [low, high) bucket bounds; bucket names sort lexically."""
+        return start.isoformat(), (end + timedelta(days=1)).isoformat()
+
+    @staticmethod
+    def _empty_bucket(bucket):
+        return {"bucket": bucket, "active_users": 0, "queries": 0, "escalations": 0,
+                "resolved": 0, "resolution_seconds": 0.0, "categories": {}}
+
+    @staticmethod
+    def get_series(granularity, start, end):
+        """
+        Per-bucket totals between two dates (inclusive):
+        [{bucket, active_users, queries, escalations, resolved, resolution_seconds, categories: {category: queries}}]
+        """
+        low, high = AnalyticsRepository.bucket_range(start, end)
+        with connect() as conn:
+            series = {}
+            for row in conn.execute("""
+                SELECT bucket, category, queries, escalations, resolved, resolution_seconds
+                FROM analytics_rollups
+                WHERE granularity = ? AND bucket >= ? AND bucket < ?
+                ORDER BY bucket
+            """, (granularity, low, high)):
+                item = series.setdefault(row["bucket"], AnalyticsRepository._empty_bucket(row["bucket"]))
+                for field in ("queries", "escalations", "resolved", "resolution_seconds"):
+                    item[field] += row[field]
+                if row["queries"]:
+                    item["categories"][row["category"]] = row["queries"]
+
+            for row in conn.execute("""
+                SELECT bucket, COUNT(*) AS users
+                FROM analytics_active_users
+                WHERE granularity = ? AND bucket >= ? AND bucket < ?
+                GROUP BY bucket
+            """, (granularity, low, high)):
+                series.setdefault(row["bucket"], AnalyticsRepository._empty_bucket(row["bucket"]))["active_users"] = row["users"]
+        return [series[bucket] for bucket in sorted(series)]
+
+    @staticmethod
+    def get_category_totals(start, end):
+        """Per-category totals between two dates (inclusive), from the daily rollups."""
+        low, high = AnalyticsRepository.bucket_range(start, end)
+        with connect() as conn:
+            cursor = conn.execute("""
+                SELECT category, SUM(queries) AS queries, SUM(escalations) AS escalations,
+                       SUM(resolved) AS resolved, SUM(resolution_seconds) AS resolution_seconds
+                FROM analytics_rollups
+                WHERE granularity = 'day' AND bucket >= ? AND bucket < ?
+                GROUP BY category
+                ORDER BY queries DESC
+            """, (low, high))
+            return [dict(row) for row in cursor]
@@ -0,0 +1,113 @@
+from repositories.connection import connect
+from repositories.timestamps import IST_OFFSET_SECONDS, month_range, day_range
+
+class ArchiveRepository:
+    """Database side of chat history archival: picking rows to archive, the manifest, removing archived rows."""
+
+    # Manifest fields the API returns; min_epoch/max_epoch are for range filtering only
+    MANIFEST_COLUMNS = ("id, table_name, period, file_name, compression, row_count, min_id, max_id, "
+                        "min_timestamp, max_timestamp, sha256, created_at")
+
+    @staticmethod
+    def months_before(cutoff):
+        """'YYYY-MM' (IST) periods that have chat rows older than cutoff (epoch seconds)."""
+        with connect() as conn:
+            cursor = conn.execute(f"""
+                SELECT DISTINCT strftime('%Y-%m', timestamp_epoch + {IST_OFFSET_SECONDS}, 'unixepoch') AS period
+                FROM chat_history
+                WHERE timestamp_epoch < ?
+                ORDER BY period
+            """, (cutoff,))
+            return [row["period"] for row in cursor]
+
+    @staticmethod
+    def iter_rows(period, cutoff, batch_size):
+        """Yields batches of the period's rows older than cutoff, in id order (keyset on id)."""
+        conn = connect()
+        low, high = month_range(period)
+        last_id = 0
+        while True:
+            rows = conn.execute("""
+                SELECT * FROM chat_history
+                WHERE timestamp_epoch >= ? AND timestamp_epoch < ? AND timestamp_epoch < ? AND id > ?
+                ORDER BY id
+                LIMIT ?
+            """, (low, high, cutoff, last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+            last_id = rows[-1]["id"]
+
+    @staticmethod
+    def commit_archive(entry, cutoff):
+        """
+        Records an archive file and deletes exactly the rows it holds, in one transaction.
+        Returns False (and changes nothing) if the rows no longer match what was written.
+        """
+        conn = connect()
+        low, high = month_range(entry["period"])
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute("""
+                DELETE FROM chat_history
+                WHERE timestamp_epoch >= ? AND timestamp_epoch < ? AND timestamp_epoch < ? AND id BETWEEN ? AND ?
+            """, (low, high, cutoff, entry["min_id"], entry["max_id"]))
+            if cursor.rowcount != entry["row_count"]:
+                conn.rollback()
+                return False
+            conn.execute("""
+                INSERT INTO archive_manifest (table_name, period, file_name, compression, row_count, min_id, max_id,
+                                              min_timestamp, max_timestamp, min_epoch, max_epoch, sha256, created_at)
+                VALUES (:table_name, :period, :file_name, :compression, :row_count, :min_id, :max_id,
+                        :min_timestamp, :max_timestamp, :min_epoch, :max_epoch, :sha256, :created_at)
+            """, entry)
+            conn.commit()
+            return True
+        except Exception:
+            conn.rollback()
+            raise
+
+    @staticmethod
+    def is_recorded(file_name):
+        """True if a manifest row references the archive file."""
+        with connect() as conn:
+            return conn.execute("SELECT 1 FROM archive_manifest WHERE file_name = ?", (file_name,)).fetchone() is not None
+
+    @staticmethod
+    def reclaim_space():
+        """
+        Returns the pages freed by archived rows to the filesystem, so the database file shrinks.
+        The first run is a full VACUUM that switches the file to incremental auto-vacuum;
+        later runs are a cheap PRAGMA incremental_vacuum. Returns the pages freed.
+        """
+        conn = connect()
+        freed = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # executescript: neither statement may run inside a transaction, and incremental_vacuum
+        # only frees every page when stepped to completion
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # The setting is per connection and only applied by a VACUUM on that same connection
+            conn.executescript("PRAGMA auto_vacuum=INCREMENTAL; VACUUM")
+        else:
+            conn.executescript("PRAGMA incremental_vacuum")
+        # In WAL mode the main file is truncated when the log is checkpointed
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return freed
+
+    @staticmethod
+    def list_archives(start=None, end=None):
+        """Manifest entries whose rows overlap the inclusive YYYY-MM-DD range (IST days), oldest first."""
+        clauses, params = ["table_name = 'chat_history'"], []
+        low, high = day_range(start, end)
+        if low is not None:
+            clauses.append("max_epoch >= ?")
+            params.append(low)
+        if high is not None:
+            clauses.append("min_epoch < ?")
+            params.append(high)
+        with connect() as conn:
+            cursor = conn.execute(f"""
+                SELECT {ArchiveRepository.MANIFEST_COLUMNS} FROM archive_manifest
+                WHERE {' AND '.join(clauses)}
+                ORDER BY min_epoch, id
+            """, params)
+            return [dict(row) for row in cursor]
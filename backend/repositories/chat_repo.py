@@ -1,27 +1,34 @@
-import sqlite3
-from core.constants import DB_PATHS
+from repositories.connection import connect
+from repositories.pagination import keyset_page, date_range_clauses
+from repositories.timestamps import to_epoch
 
 class ChatRepository:
 
+    # What the API returns; timestamp_epoch is for filtering and ordering only
+    COLUMNS = "id, timestamp, user_name, email, phone_number, user_query, bot_response, category"
+
     @staticmethod
     def save_chat(timestamp, user_name, email, phone, query, response, category):
         try:
-            with sqlite3.connect(DB_PATHS["CHATS"]) as conn:
+            with connect() as conn:
                 conn.execute("""
-                    INSERT INTO chat_history (timestamp, user_name, email, phone_number, user_query, bot_response, category)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (timestamp, user_name, email, phone, query, response, category))
+                    INSERT INTO chat_history (timestamp, timestamp_epoch, user_name, email, phone_number, user_query, bot_response, category)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (timestamp, to_epoch(timestamp), user_name, email, phone, query, response, category))
         except Exception as e:
             print(f"Error saving chat: {e}")
 
     # --- NEW: Added for Admin Dashboard ---
     @staticmethod
-    def get_all_chats():
-        try:
-            with sqlite3.connect(DB_PATHS["CHATS"]) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute("SELECT * FROM chat_history ORDER BY timestamp DESC")
-                return [dict(row) for row in cursor.fetchall()]
-        except Exception as e:
-            print(f"Error fetching chats: {e}")
-            return []
\ No newline at end of file
+    def get_chats_page(cursor=None, limit=100, start=None, end=None, category=None, phone=None):
+        """Newest-first page of chat history with optional filters. Returns (chats, next_cursor); database errors propagate."""
+        clauses, params = date_range_clauses("timestamp_epoch", start, end)
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if phone:
+            clauses.append("phone_number = ?")
+            params.append(phone)
+        with connect() as conn:
+            return keyset_page(conn, "chat_history", "timestamp_epoch", "id", clauses, params, cursor, limit,
+                               columns=ChatRepository.COLUMNS)
@@ -0,0 +1,92 @@
+import atexit
+import sqlite3
+import threading
+from core.config import Config
+from core.constants import DATABASE_PATH
+
+
+class ConnectionManager:
+    """
+    Hands out one SQLite connection per (thread, database file) and reuses it for every query.
+    Connections run in WAL mode so readers never block the writer, with prepared statements
+    cached per connection. Connections of finished threads are closed on the next open,
+    and everything is closed at interpreter shutdown.
+
+    Usage matches sqlite3.connect():
+        with connect() as conn:
+            conn.execute(...)
+    The `with` block commits (or rolls back) but leaves the connection open for reuse.
+    """
+
+    def __init__(self, busy_timeout_ms=None, cache_size_kb=None, cached_statements=None):
+        self.busy_timeout_ms = busy_timeout_ms if busy_timeout_ms is not None else Config.DB_BUSY_TIMEOUT_MS
+        self.cache_size_kb = cache_size_kb if cache_size_kb is not None else Config.DB_CACHE_SIZE_KB
+        self.cached_statements = cached_statements if cached_statements is not None else Config.DB_STATEMENT_CACHE
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (owning thread, connection) for every open connection, so they can be closed from outside
+        self._open = []
+
+    def connect(self, db_path):
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(db_path)
+        if conn is None:
+            conn = connections[db_path] = self._open_connection(db_path)
+        return conn
+
+    def _open_connection(self, db_path):
+        # Only the owning thread uses the connection; check_same_thread is off so close_all() can close it
+        conn = sqlite3.connect(
+            db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Durable at every checkpoint; safe against corruption in WAL mode, far fewer fsyncs than FULL
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        # Negative value = size in KiB rather than pages
+        conn.execute(f"PRAGMA cache_size={-int(self.cache_size_kb)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+
+        with self._lock:
+            self._close_dead_threads()
+            self._open.append((threading.current_thread(), conn))
+        return conn
+
+    def _close_dead_threads(self):
+        """Closes connections owned by threads that have exited (e.g. per-request server threads)."""
+        alive = []
+        for thread, conn in self._open:
+            if thread.is_alive():
+                alive.append((thread, conn))
+            else:
+                conn.close()
+        self._open = alive
+
+    def close_all(self):
+        with self._lock:
+            for _, conn in self._open:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    print(f"Error closing database connection: {e}")
+            self._open = []
+        self._local = threading.local()
+
+
+_manager = ConnectionManager()
+atexit.register(_manager.close_all)
+
+
+def connect(db_path=DATABASE_PATH):
+    """Returns this thread's pooled connection to db_path (the application database by default)."""
+    return _manager.connect(db_path)
+
+
+def close_all():
+    _manager.close_all()
@@ -0,0 +1,54 @@
+from repositories.connection import connect
+from repositories.timestamps import IST_OFFSET_SECONDS
+
+class CounterRepository:
+    """
+    Dashboard counters kept up to date by triggers on all_users and escalated_queries (migrations 6 and 14).
+    Names: 'users', 'users_active:<IST YYYY-MM-DD of last_seen_epoch>', 'escalations:<status>'.
+    """
+
+    # What every counter should be, computed from the base tables
+    EXPECTED_SQL = f"""
+        SELECT 'users', COUNT(*) FROM all_users
+        UNION ALL
+        SELECT 'users_active:' || date(last_seen_epoch + {IST_OFFSET_SECONDS}, 'unixepoch'), COUNT(*) FROM all_users GROUP BY 1
+        UNION ALL
+        SELECT 'escalations:' || status, COUNT(*) FROM escalated_queries GROUP BY status
+    """
+
+    @staticmethod
+    def get_counts(names):
+        """Returns {name: value} for the requested counters; missing counters are 0."""
+        counts = dict.fromkeys(names, 0)
+        try:
+            with connect() as conn:
+                placeholders = ",".join("?" * len(names))
+                cursor = conn.execute(f"SELECT name, value FROM dashboard_counters WHERE name IN ({placeholders})", list(names))
+                counts.update({row["name"]: row["value"] for row in cursor})
+        except Exception as e:
+            print(f"Error fetching counters: {e}")
+        return counts
+
+    @staticmethod
+    def reconcile():
+        """
+        Recomputes every counter from the base tables and rewrites the ones that drifted
+        (e.g. rows changed with triggers disabled or by hand). Returns the number of counters corrected.
+        """
+        conn = connect()
+        # IMMEDIATE takes the write lock up front, so no write lands between counting and rewriting
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expected = {name: value for name, value in conn.execute(CounterRepository.EXPECTED_SQL)}
+            actual = {row["name"]: row["value"] for row in conn.execute("SELECT name, value FROM dashboard_counters")}
+            drifted = [name for name in expected.keys() | actual.keys() if expected.get(name, 0) != actual.get(name, 0)]
+            if drifted:
+                conn.execute("DELETE FROM dashboard_counters")
+                conn.executemany("INSERT INTO dashboard_counters (name, value) VALUES (?, ?)", expected.items())
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if drifted:
+            print(f"Dashboard counters: corrected {len(drifted)} drifted counters ({', '.join(sorted(drifted)[:5])})")
+        return len(drifted)
@@ -1,46 +1,94 @@
-import sqlite3
-from core.constants import DB_PATHS
+from datetime import datetime
+from repositories.connection import connect
+from repositories.pagination import keyset_page, date_range_clauses
+from repositories.timestamps import IST, to_epoch
 
 class EscalationRepository:
 
+    # What the API returns; the *_epoch columns are for filtering and ordering only
+    COLUMNS = ("id, timestamp, user_name, email, phone_number, query_text, bot_response, status, remarks, "
+               "category, resolved_at")
+
     @staticmethod
     def add_escalation(timestamp, user_name, email, phone, query, response, category):
         try:
-            with sqlite3.connect(DB_PATHS["ESCALATION"]) as conn:
+            with connect() as conn:
                 conn.execute("""
-                    INSERT INTO escalated_queries (timestamp, user_name, email, phone_number, query_text, bot_response, status, remarks, category) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (timestamp, user_name or 'N/A', email, phone or 'N/A', query, response, "Initiated", "", category))
+                    INSERT INTO escalated_queries (timestamp, timestamp_epoch, user_name, email, phone_number, query_text, bot_response, status, remarks, category) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (timestamp, to_epoch(timestamp), user_name or 'N/A', email, phone or 'N/A', query, response, "Initiated", "", category))
         except Exception as e:
             print(f"Error adding escalation: {e}")
 
     @staticmethod
-    def get_all_escalated():
+    def get_escalations_page(cursor=None, limit=100, start=None, end=None, category=None, status=None, phone=None):
+        """Newest-first page of escalated queries with optional filters. Returns (escalations, next_cursor); database errors propagate."""
+        clauses, params = date_range_clauses("timestamp_epoch", start, end)
+        for column, value in (("category", category), ("status", status), ("phone_number", phone)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        with connect() as conn:
+            return keyset_page(conn, "escalated_queries", "timestamp_epoch", "id", clauses, params, cursor, limit,
+                               columns=EscalationRepository.COLUMNS)
+
+    @staticmethod
+    def get_user_summary(status, limit=None, offset=0):
+        """
+        Escalations with the given status grouped per user (phone number), busiest first.
+        Served from the (status, phone_number, timestamp_epoch, timestamp, user_name) index. Returns
+        [{phone_number, user_name, query_count, last_query_at}].
+        """
+        # With MAX(), SQLite takes the bare user_name and timestamp from the user's latest row
+        query = """
+            SELECT phone_number, user_name, query_count, last_query_at FROM (
+                SELECT phone_number, user_name, COUNT(*) AS query_count,
+                       MAX(timestamp_epoch) AS last_query_epoch, timestamp AS last_query_at
+                FROM escalated_queries
+                WHERE status = ?
+                GROUP BY phone_number
+            )
+            ORDER BY query_count DESC, last_query_epoch DESC
+        """
+        params = [status]
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
         try:
-            with sqlite3.connect(DB_PATHS["ESCALATION"]) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute("SELECT * FROM escalated_queries ORDER BY timestamp DESC")
-                return [dict(row) for row in cursor.fetchall()]
+            with connect() as conn:
+                return [dict(row) for row in conn.execute(query, params)]
         except Exception as e:
-            print(f"Error fetching escalations: {e}")
+            print(f"Error summarising escalations: {e}")
             return []
 
     @staticmethod
     def update_status(query_id, status, remarks):
-        with sqlite3.connect(DB_PATHS["ESCALATION"]) as conn:
-            cursor = conn.execute(
-                "UPDATE escalated_queries SET status = ?, remarks = ? WHERE id = ?",
-                (status, remarks, query_id)
-            )
+        # resolved_at records the first time the query was marked Finished. It is kept if the query is
+        # reopened, so finishing it again can't make the analytics rollups count the resolution twice.
+        # resolved_epoch is taken from SQLite's clock inside the UPDATE, i.e. under the write lock,
+        # which the rollup watermark relies on (see AnalyticsRepository._roll_up_resolutions).
+        resolved_at = datetime.now(IST).isoformat()
+        with connect() as conn:
+            cursor = conn.execute("""
+                UPDATE escalated_queries
+                SET status = ?, remarks = ?,
+                    resolved_at = CASE WHEN ? = 'Finished' THEN IFNULL(resolved_at, ?) ELSE resolved_at END,
+                    resolved_epoch = CASE WHEN ? = 'Finished'
+                                          THEN IFNULL(resolved_epoch, CAST(strftime('%s', 'now') AS INTEGER))
+                                          ELSE resolved_epoch END
+                WHERE id = ?
+            """, (status, remarks, status, resolved_at, status, query_id))
             return cursor.rowcount > 0
 
     # --- NEW: Fix for 'User Queries' Popup ---
     @staticmethod
     def get_escalations_by_email(email):
         try:
-            with sqlite3.connect(DB_PATHS["ESCALATION"]) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute("SELECT * FROM escalated_queries WHERE email = ? ORDER BY timestamp DESC", (email,))
+            with connect() as conn:
+                cursor = conn.execute(f"""
+                    SELECT {EscalationRepository.COLUMNS} FROM escalated_queries
+                    WHERE email = ? ORDER BY timestamp_epoch DESC, id DESC
+                """, (email,))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
             print(f"Error fetching user queries: {e}")
@@ -50,9 +98,11 @@ class EscalationRepository:
     @staticmethod
     def get_escalations_by_phone(phone):
         try:
-            with sqlite3.connect(DB_PATHS["ESCALATION"]) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute("SELECT * FROM escalated_queries WHERE phone_number = ? ORDER BY timestamp DESC", (phone,))
+            with connect() as conn:
+                cursor = conn.execute(f"""
+                    SELECT {EscalationRepository.COLUMNS} FROM escalated_queries
+                    WHERE phone_number = ? ORDER BY timestamp_epoch DESC, id DESC
+                """, (phone,))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
             print(f"Error fetching user queries by phone: {e}")
@@ -0,0 +1,526 @@
+import os
+import sqlite3
+from datetime import datetime
+import pytz
+from core.constants import LEGACY_DB_PATHS
+from repositories.timestamps import IST_OFFSET_SECONDS
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# Rows copied per executemany() when importing the legacy database files
+IMPORT_BATCH = 1000
+
+
+def _initial_schema(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS all_users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_name TEXT,
+        email TEXT,
+        phone_number TEXT,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS otp_requests (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT NOT NULL,
+        otp_hash TEXT NOT NULL,
+        expires_at TEXT NOT NULL
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS chat_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        user_name TEXT,
+        email TEXT,
+        phone_number TEXT,
+        user_query TEXT,
+        bot_response TEXT,
+        category TEXT
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS escalated_queries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        user_name TEXT,
+        email TEXT,
+        phone_number TEXT,
+        query_text TEXT NOT NULL,
+        bot_response TEXT NOT NULL,
+        status TEXT NOT NULL,
+        remarks TEXT,
+        category TEXT
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS staff_members (
+        staff_id TEXT PRIMARY KEY,
+        staff_name TEXT NOT NULL
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS session_logs (
+        session_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        staff_id TEXT NOT NULL,
+        login_time TEXT NOT NULL,
+        logout_time TEXT,
+        FOREIGN KEY (staff_id) REFERENCES staff_members(staff_id)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS edit_logs (
+        log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        staff_id TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        action_performed TEXT NOT NULL,
+        document_name TEXT NOT NULL
+    )
+    """)
+
+
+# Legacy file -> tables it held
+LEGACY_TABLES = {
+    "USERS": ["all_users"],
+    "OTP": ["otp_requests"],
+    "CHATS": ["chat_history"],
+    "ESCALATION": ["escalated_queries"],
+    "STAFF": ["staff_members", "session_logs"],
+    "LOGS": ["edit_logs"],
+}
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _import_legacy_databases(conn):
+    """
+    Copies every row of the old per-entity database files into the single database, keeping ids,
+    so existing deployments upgrade in place. The old files are left untouched as a backup.
+    """
+    for key, tables in LEGACY_TABLES.items():
+        path = LEGACY_DB_PATHS[key]
+        if not os.path.exists(path):
+            continue
+        source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            existing = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table in tables:
+                if table not in existing:
+                    continue
+                # Very old files may predate columns such as 'category'
+                columns = [c for c in _columns(source, table) if c in set(_columns(conn, table))]
+                column_list = ", ".join(columns)
+                cursor = source.execute(f"SELECT {column_list} FROM {table}")
+                copied = 0
+                while True:
+                    rows = cursor.fetchmany(IMPORT_BATCH)
+                    if not rows:
+                        break
+                    conn.executemany(
+                        f"INSERT OR IGNORE INTO {table} ({column_list}) VALUES ({', '.join('?' * len(columns))})",
+                        rows
+                    )
+                    copied += len(rows)
+                print(f"Imported {copied} rows into {table} from {os.path.basename(path)}")
+        finally:
+            source.close()
+
+
+def _default_staff(conn):
+    conn.execute("INSERT OR IGNORE INTO staff_members (staff_id, staff_name) VALUES (?, ?)",
+                 ('BIT-STAFF-101', 'Dr. S. Ramesh'))
+
+
+def _hot_path_indexes(conn):
+    # One row per phone number: merge duplicates left by the old SELECT-then-INSERT race into the oldest row
+    conn.execute("""
+    UPDATE all_users SET
+        first_seen = (SELECT MIN(d.first_seen) FROM all_users d WHERE d.phone_number = all_users.phone_number),
+        last_seen = (SELECT MAX(d.last_seen) FROM all_users d WHERE d.phone_number = all_users.phone_number)
+    WHERE phone_number IN (SELECT phone_number FROM all_users GROUP BY phone_number HAVING COUNT(*) > 1)
+    """)
+    conn.execute("""
+    DELETE FROM all_users
+    WHERE phone_number IS NOT NULL
+      AND id NOT IN (SELECT MIN(id) FROM all_users WHERE phone_number IS NOT NULL GROUP BY phone_number)
+    """)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_all_users_phone ON all_users (phone_number)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_all_users_last_seen ON all_users (last_seen)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_all_users_email ON all_users (email)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_otp_requests_email ON otp_requests (email)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_timestamp ON chat_history (timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_phone ON chat_history (phone_number, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_timestamp ON escalated_queries (timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_status ON escalated_queries (status, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_phone ON escalated_queries (phone_number, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_email ON escalated_queries (email, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_session_logs_staff ON session_logs (staff_id, login_time)")
+
+
+def _category_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_category ON chat_history (category, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_category ON escalated_queries (category, timestamp)")
+
+
+def _bump(name_sql, delta):
+    """Trigger statement adding delta to a dashboard counter, creating it if missing."""
+    return (f"INSERT INTO dashboard_counters (name, value) VALUES ({name_sql}, {delta}) "
+            f"ON CONFLICT (name) DO UPDATE SET value = value + {delta};")
+
+
+def _dashboard_counters(conn):
+    # users, users_active:<YYYY-MM-DD of last_seen>, escalations:<status>
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS dashboard_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    user_day = "'users_active:' || substr({}.last_seen, 1, 10)"
+    status = "'escalations:' || {}.status"
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_all_users_count_insert AFTER INSERT ON all_users BEGIN
+        {_bump("'users'", 1)}
+        {_bump(user_day.format("NEW"), 1)}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_all_users_count_delete AFTER DELETE ON all_users BEGIN
+        {_bump("'users'", -1)}
+        {_bump(user_day.format("OLD"), -1)}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_all_users_count_last_seen AFTER UPDATE OF last_seen ON all_users
+    WHEN substr(OLD.last_seen, 1, 10) IS NOT substr(NEW.last_seen, 1, 10) BEGIN
+        {_bump(user_day.format("OLD"), -1)}
+        {_bump(user_day.format("NEW"), 1)}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_escalated_queries_count_insert AFTER INSERT ON escalated_queries BEGIN
+        {_bump(status.format("NEW"), 1)}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_escalated_queries_count_delete AFTER DELETE ON escalated_queries BEGIN
+        {_bump(status.format("OLD"), -1)}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_escalated_queries_count_status AFTER UPDATE OF status ON escalated_queries
+    WHEN OLD.status IS NOT NEW.status BEGIN
+        {_bump(status.format("OLD"), -1)}
+        {_bump(status.format("NEW"), 1)}
+    END
+    """)
+    conn.execute("""
+    INSERT OR REPLACE INTO dashboard_counters (name, value)
+    SELECT 'users', COUNT(*) FROM all_users
+    UNION ALL
+    SELECT 'users_active:' || substr(last_seen, 1, 10), COUNT(*) FROM all_users GROUP BY substr(last_seen, 1, 10)
+    UNION ALL
+    SELECT 'escalations:' || status, COUNT(*) FROM escalated_queries GROUP BY status
+    """)
+
+
+def _escalation_summary_index(conn):
+    # Covers the per-user GROUP BY of the escalated/solved summaries without touching the table
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_escalated_queries_status_phone
+    ON escalated_queries (status, phone_number, timestamp, user_name)
+    """)
+
+
+def _fts_mirror(conn, table, columns):
+    """External-content FTS5 index over table's text columns, kept in sync by triggers."""
+    fts = f"{table}_fts"
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"NEW.{c}" for c in columns)
+    old_values = ", ".join(f"OLD.{c}" for c in columns)
+    conn.execute(f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+        {column_list}, content='{table}', content_rowid='id', tokenize='porter unicode61'
+    )
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table} BEGIN
+        INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.id, {new_values});
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table} BEGIN
+        INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', OLD.id, {old_values});
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {column_list} ON {table} BEGIN
+        INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', OLD.id, {old_values});
+        INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.id, {new_values});
+    END
+    """)
+    # Index the rows that already exist
+    conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def _full_text_search(conn):
+    _fts_mirror(conn, "chat_history", ["user_query", "bot_response"])
+    _fts_mirror(conn, "escalated_queries", ["query_text", "remarks"])
+
+
+def _edit_log_search(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_edit_logs_timestamp ON edit_logs (timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_edit_logs_staff ON edit_logs (staff_id, timestamp)")
+    # Trigram tokens give indexed substring matching, the same results as LIKE '%term%' (terms of 3+ characters).
+    # The editor's name is copied in from staff_members so one MATCH covers name, ID and document.
+    conn.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS edit_logs_fts USING fts5(
+        staff_id, staff_name, document_name, tokenize='trigram'
+    )
+    """)
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_edit_logs_fts_insert AFTER INSERT ON edit_logs BEGIN
+        INSERT INTO edit_logs_fts (rowid, staff_id, staff_name, document_name)
+        VALUES (NEW.log_id, NEW.staff_id,
+                (SELECT staff_name FROM staff_members WHERE staff_id = NEW.staff_id), NEW.document_name);
+    END
+    """)
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_edit_logs_fts_delete AFTER DELETE ON edit_logs BEGIN
+        DELETE FROM edit_logs_fts WHERE rowid = OLD.log_id;
+    END
+    """)
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_edit_logs_fts_staff_insert AFTER INSERT ON staff_members BEGIN
+        UPDATE edit_logs_fts SET staff_name = NEW.staff_name
+        WHERE rowid IN (SELECT log_id FROM edit_logs WHERE staff_id = NEW.staff_id);
+    END
+    """)
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_edit_logs_fts_staff_rename AFTER UPDATE OF staff_name ON staff_members BEGIN
+        UPDATE edit_logs_fts SET staff_name = NEW.staff_name
+        WHERE rowid IN (SELECT log_id FROM edit_logs WHERE staff_id = NEW.staff_id);
+    END
+    """)
+    conn.execute("""
+    INSERT INTO edit_logs_fts (rowid, staff_id, staff_name, document_name)
+    SELECT el.log_id, el.staff_id, es.staff_name, el.document_name
+    FROM edit_logs el LEFT JOIN staff_members es ON el.staff_id = es.staff_id
+    """)
+
+
+def _analytics_rollups(conn):
+    # When an escalation was marked Finished; unknown (NULL) for ones resolved before this migration
+    conn.execute("ALTER TABLE escalated_queries ADD COLUMN resolved_at TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_resolved_at ON escalated_queries (resolved_at)")
+
+    # Buckets are local (IST) 'YYYY-MM-DD' for granularity 'day' and 'YYYY-MM-DDTHH' for 'hour'
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS analytics_rollups (
+        granularity TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        category TEXT NOT NULL,
+        queries INTEGER NOT NULL DEFAULT 0,
+        escalations INTEGER NOT NULL DEFAULT 0,
+        resolved INTEGER NOT NULL DEFAULT 0,
+        resolution_seconds REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (granularity, bucket, category)
+    )
+    """)
+    # Distinct users per bucket; active-user counts can't be summed across batches, so the set is kept
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS analytics_active_users (
+        granularity TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        phone_number TEXT NOT NULL,
+        PRIMARY KEY (granularity, bucket, phone_number)
+    ) WITHOUT ROWID
+    """)
+    # How far each source has been rolled up: last id for inserts, last resolved_at for resolutions
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS analytics_watermarks (
+        source TEXT PRIMARY KEY,
+        position TEXT NOT NULL
+    )
+    """)
+
+
+def _archive_manifest(conn):
+    # One row per archive file; a month can span several files as its rows age out over successive runs
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS archive_manifest (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        period TEXT NOT NULL,
+        file_name TEXT NOT NULL UNIQUE,
+        compression TEXT NOT NULL,
+        row_count INTEGER NOT NULL,
+        min_id INTEGER NOT NULL,
+        max_id INTEGER NOT NULL,
+        min_timestamp TEXT NOT NULL,
+        max_timestamp TEXT NOT NULL,
+        sha256 TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_archive_manifest_period ON archive_manifest (table_name, period)")
+
+
+def _epoch_sql(column):
+    """Unix epoch of an ISO timestamp column in SQL; values without an offset are IST, as in timestamps.to_epoch()."""
+    return (f"CAST(strftime('%s', {column}) AS INTEGER) - "
+            f"CASE WHEN {column} GLOB '*[+-][0-9][0-9]:[0-9][0-9]' OR {column} GLOB '*Z' THEN 0 ELSE {IST_OFFSET_SECONDS} END")
+
+
+# (table, ISO text column, integer epoch column written alongside it)
+EPOCH_COLUMNS = [
+    ("all_users", "first_seen", "first_seen_epoch"),
+    ("all_users", "last_seen", "last_seen_epoch"),
+    ("chat_history", "timestamp", "timestamp_epoch"),
+    ("escalated_queries", "timestamp", "timestamp_epoch"),
+    ("escalated_queries", "resolved_at", "resolved_epoch"),
+    ("edit_logs", "timestamp", "timestamp_epoch"),
+]
+
+
+def _epoch_timestamps(conn):
+    # The ISO columns stay as the display value; every range filter, sort and bucket reads the epoch instead
+    for table, column, epoch in EPOCH_COLUMNS:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {epoch} INTEGER")
+        conn.execute(f"UPDATE {table} SET {epoch} = {_epoch_sql(column)} WHERE {column} IS NOT NULL")
+    # The resolutions rollup watermark moves from resolved_at to resolved_epoch
+    conn.execute(f"""
+    UPDATE analytics_watermarks SET position = {_epoch_sql('position')}
+    WHERE source = 'resolutions' AND position != ''
+    """)
+
+    # Replace the ISO-ordered indexes with the same keys on the epoch columns
+    for index in ("idx_all_users_last_seen", "idx_chat_history_timestamp", "idx_chat_history_phone",
+                  "idx_chat_history_category", "idx_escalated_queries_timestamp", "idx_escalated_queries_status",
+                  "idx_escalated_queries_phone", "idx_escalated_queries_email", "idx_escalated_queries_category",
+                  "idx_escalated_queries_resolved_at", "idx_edit_logs_timestamp"):
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_all_users_last_seen_epoch ON all_users (last_seen_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_epoch ON chat_history (timestamp_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_phone_epoch ON chat_history (phone_number, timestamp_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_category_epoch ON chat_history (category, timestamp_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_epoch ON escalated_queries (timestamp_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_status_epoch ON escalated_queries (status, timestamp_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_phone_epoch ON escalated_queries (phone_number, timestamp_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_email_epoch ON escalated_queries (email, timestamp_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_category_epoch ON escalated_queries (category, timestamp_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalated_queries_resolved_epoch ON escalated_queries (resolved_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_edit_logs_epoch ON edit_logs (timestamp_epoch)")
+
+
+
+def _incremental_vacuum(conn):
+    # No lasting effect: auto_vacuum is a per-connection setting that only a VACUUM on the same
+    # connection applies. ArchiveRepository.reclaim_space() sets it and runs that VACUUM itself.
+    # Kept so the applied version numbers stay unchanged.
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+
+
+def _epoch_follow_up(conn):
+    # Per-day active-user counters are keyed by the IST day of last_seen_epoch, the same day the
+    # dashboard asks for and get_today_users() filters on, instead of the first ten characters of last_seen
+    user_day = f"'users_active:' || date({{}}.last_seen_epoch + {IST_OFFSET_SECONDS}, 'unixepoch')"
+    for trigger in ("trg_all_users_count_insert", "trg_all_users_count_delete", "trg_all_users_count_last_seen"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute(f"""
+    CREATE TRIGGER trg_all_users_count_insert AFTER INSERT ON all_users BEGIN
+        {_bump("'users'", 1)}
+        {_bump(user_day.format("NEW"), 1)}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER trg_all_users_count_delete AFTER DELETE ON all_users BEGIN
+        {_bump("'users'", -1)}
+        {_bump(user_day.format("OLD"), -1)}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER trg_all_users_count_last_seen AFTER UPDATE OF last_seen_epoch ON all_users
+    WHEN {user_day.format("OLD")} IS NOT {user_day.format("NEW")} BEGIN
+        {_bump(user_day.format("OLD"), -1)}
+        {_bump(user_day.format("NEW"), 1)}
+    END
+    """)
+    conn.execute("DELETE FROM dashboard_counters WHERE name LIKE 'users_active:%'")
+    conn.execute(f"""
+    INSERT INTO dashboard_counters (name, value)
+    SELECT {user_day.format("all_users")}, COUNT(*) FROM all_users GROUP BY 1
+    """)
+
+    # The per-user escalation summary orders by the latest timestamp_epoch
+    conn.execute("DROP INDEX IF EXISTS idx_escalated_queries_status_phone")
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_escalated_queries_status_phone_epoch
+    ON escalated_queries (status, phone_number, timestamp_epoch, timestamp, user_name)
+    """)
+
+    # Archive files are picked by epoch range too
+    conn.execute("ALTER TABLE archive_manifest ADD COLUMN min_epoch INTEGER")
+    conn.execute("ALTER TABLE archive_manifest ADD COLUMN max_epoch INTEGER")
+    conn.execute(f"""
+    UPDATE archive_manifest SET min_epoch = {_epoch_sql('min_timestamp')}, max_epoch = {_epoch_sql('max_timestamp')}
+    """)
+
+
+# (version, description, migration). Append new migrations at the end; never edit or reorder applied ones.
+MIGRATIONS = [
+    (1, "initial schema", _initial_schema),
+    (2, "import legacy per-entity database files", _import_legacy_databases),
+    (3, "default editor staff member", _default_staff),
+    (4, "indexes for hot lookups, unique user phone number", _hot_path_indexes),
+    (5, "category indexes for filtered admin lists", _category_indexes),
+    (6, "trigger-maintained dashboard counters", _dashboard_counters),
+    (7, "covering index for per-user escalation summaries", _escalation_summary_index),
+    (8, "FTS5 full-text search over chat history and escalations", _full_text_search),
+    (9, "indexed search and date ranges for editor activity logs", _edit_log_search),
+    (10, "escalation resolved_at and analytics rollup tables", _analytics_rollups),
+    (11, "manifest of chat history archive files", _archive_manifest),
+    (12, "integer epoch timestamp columns with range indexes", _epoch_timestamps),
+    (13, "incremental auto-vacuum, so archived rows give space back", _incremental_vacuum),
+    (14, "IST-day user counters, summary index and archive manifest on epoch columns", _epoch_follow_up),
+]
+
+
+def current_version(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TEXT NOT NULL
+    )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn, target=None):
+    """
+    Applies every migration newer than the database's schema_version (up to `target`, if given),
+    each in its own transaction together with its schema_version row, so a failed migration
+    leaves the database at the previous version. Returns the resulting version.
+    """
+    version = current_version(conn)
+    for number, description, migration in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+        print(f"Applying migration {number}: {description}")
+        conn.execute("BEGIN")
+        try:
+            migration(conn)
+            conn.execute("INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                         (number, description, datetime.now(IST).isoformat()))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = number
+    return version
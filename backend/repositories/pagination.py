@@ -0,0 +1,68 @@
+import json
+import base64
+from repositories.timestamps import day_range
+
+
+def encode_cursor(sort_value, row_id):
+    """Opaque cursor pointing just past (sort_value, row_id)."""
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Returns (sort_value, row_id). Raises ValueError on a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(sort_value, int) or not isinstance(row_id, int):
+        raise ValueError("Invalid cursor")
+    return sort_value, row_id
+
+
+def date_range_clauses(column, start=None, end=None):
+    """
+    WHERE clauses for an inclusive YYYY-MM-DD range (IST days) on an integer epoch column.
+    Both bounds are index range scans.
+    """
+    clauses, params = [], []
+    low, high = day_range(start, end)
+    if low is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(low)
+    if high is not None:
+        clauses.append(f"{column} < ?")
+        params.append(high)
+    return clauses, params
+
+
+def keyset_page(conn, table, sort_column, id_column, clauses, params, cursor, limit, columns):
+    """
+    Newest-first page of `table` ordered by (sort_column, id_column), continuing after `cursor`.
+    Each page is a bounded index range scan, however deep the client pages.
+    `table` may be a join; a qualified id column ("el.log_id") is read back by its bare name, so it must be in `columns`.
+    The sort column is read for the cursor only and is not part of the returned rows.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    clauses, params = list(clauses), list(params)
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        clauses.append(f"({sort_column}, {id_column}) < (?, ?)")
+        params.extend([sort_value, row_id])
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    # One extra row tells us whether another page exists
+    rows = conn.execute(
+        f"SELECT {columns}, {sort_column} AS _sort_key FROM {table} {where} "
+        f"ORDER BY {sort_column} DESC, {id_column} DESC LIMIT ?",
+        (*params, limit + 1)
+    ).fetchall()
+
+    rows = [dict(row) for row in rows]
+    sort_keys = [row.pop("_sort_key") for row in rows]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort_keys[limit - 1], rows[-1][id_column.split(".")[-1]])
+    return rows, next_cursor
@@ -0,0 +1,90 @@
+from repositories.connection import connect
+from repositories.pagination import date_range_clauses
+
+# Mark matched terms inside snippets. Control characters (STX/ETX) never occur in chat text,
+# so highlights can't be confused with content such as Markdown bold in bot responses.
+SNIPPET_OPEN = "\u0002"
+SNIPPET_CLOSE = "\u0003"
+SNIPPET_TOKENS = 16
+
+
+def to_match_query(text):
+    """
+    Turns free text into an FTS5 query: every word must match, a trailing * makes a word a prefix.
+    Each word is quoted, so user input can never be parsed as FTS syntax (AND/OR/NEAR, columns, quotes).
+    Returns None if there is nothing to search for.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms) or None
+
+
+class SearchRepository:
+    """Ranked full-text search over the FTS5 mirrors created by migration 8."""
+
+    # source -> (table, fts table, bm25 column weights, snippet columns, filterable columns)
+    SOURCES = {
+        "chats": {
+            "table": "chat_history",
+            "fts": "chat_history_fts",
+            # A hit in the user's question counts more than one in the bot's answer
+            "weights": (2.0, 1.0),
+            "columns": ["id", "timestamp", "user_name", "phone_number", "category"],
+            "snippets": {"user_query_snippet": 0, "bot_response_snippet": 1},
+            "filters": ("category", "phone_number"),
+        },
+        "escalations": {
+            "table": "escalated_queries",
+            "fts": "escalated_queries_fts",
+            "weights": (2.0, 1.0),
+            "columns": ["id", "timestamp", "user_name", "phone_number", "category", "status"],
+            "snippets": {"query_text_snippet": 0, "remarks_snippet": 1},
+            "filters": ("category", "status", "phone_number"),
+        },
+    }
+
+    @staticmethod
+    def search(source, text, limit=20, offset=0, start=None, end=None, **filters):
+        """
+        Best matches first (bm25). Returns (results, has_more).
+        Raises ValueError for an unknown source; database errors (e.g. a missing FTS5 table) propagate.
+        """
+        spec = SearchRepository.SOURCES.get(source)
+        if spec is None:
+            raise ValueError(f"Unknown search source: {source}")
+        match = to_match_query(text)
+        if match is None:
+            return [], False
+
+        fts = spec["fts"]
+        select = [f"t.{column}" for column in spec["columns"]]
+        for name, column in spec["snippets"].items():
+            select.append(f"snippet({fts}, {column}, char({ord(SNIPPET_OPEN)}), char({ord(SNIPPET_CLOSE)}), '...', "
+                          f"{SNIPPET_TOKENS}) AS {name}")
+        weights = ", ".join(str(w) for w in spec["weights"])
+        select.append(f"bm25({fts}, {weights}) AS score")
+
+        clauses, params = date_range_clauses("t.timestamp_epoch", start, end)
+        clauses.insert(0, f"{fts} MATCH ?")
+        params.insert(0, match)
+        for column in spec["filters"]:
+            value = filters.get(column)
+            if value:
+                clauses.append(f"t.{column} = ?")
+                params.append(value)
+
+        query = f"""
+            SELECT {', '.join(select)}
+            FROM {fts}
+            JOIN {spec['table']} t ON t.id = {fts}.rowid
+            WHERE {' AND '.join(clauses)}
+            ORDER BY score
+            LIMIT ? OFFSET ?
+        """
+        with connect() as conn:
+            rows = [dict(row) for row in conn.execute(query, (*params, limit + 1, offset))]
+        return rows[:limit], len(rows) > limit
@@ -1,16 +1,13 @@
-import sqlite3
-from datetime import datetime, timedelta
-import pytz
-from core.constants import DB_PATHS
-
-IST = pytz.timezone('Asia/Kolkata')
+import time
+from repositories.connection import connect
+from repositories.pagination import keyset_page, date_range_clauses
+from repositories.timestamps import to_epoch
 
 class StaffRepository:
 
     @staticmethod
     def get_staff(staff_id):
-        with sqlite3.connect(DB_PATHS["STAFF"]) as conn:
-            conn.row_factory = sqlite3.Row
+        with connect() as conn:
             cursor = conn.execute("SELECT * FROM staff_members WHERE staff_id = ?", (staff_id,))
             row = cursor.fetchone()
             return dict(row) if row else None
@@ -18,25 +15,26 @@ class StaffRepository:
 
     @staticmethod
     def create_staff(staff_id, staff_name):
-        with sqlite3.connect(DB_PATHS["STAFF"]) as conn:
+        with connect() as conn:
             conn.execute("INSERT INTO staff_members (staff_id, staff_name) VALUES (?, ?)", (staff_id, staff_name))
 
     @staticmethod
     def create_session(staff_id, login_time):
-        with sqlite3.connect(DB_PATHS["STAFF"]) as conn:
+        with connect() as conn:
             cursor = conn.execute("INSERT INTO session_logs (staff_id, login_time) VALUES (?, ?)", (staff_id, login_time))
             return cursor.lastrowid
 
     @staticmethod
     def close_session(session_id, logout_time):
-        with sqlite3.connect(DB_PATHS["STAFF"]) as conn:
+        with connect() as conn:
             conn.execute("UPDATE session_logs SET logout_time = ? WHERE session_id = ?", (logout_time, session_id))
 
     @staticmethod
     def log_action(staff_id, timestamp, action, document_name):
-        with sqlite3.connect(DB_PATHS["LOGS"]) as conn:
-            conn.execute("INSERT INTO edit_logs (staff_id, timestamp, action_performed, document_name) VALUES (?, ?, ?, ?)",
-                         (staff_id, timestamp, action, document_name))
+        with connect() as conn:
+            conn.execute("""
+                INSERT INTO edit_logs (staff_id, timestamp, timestamp_epoch, action_performed, document_name) VALUES (?, ?, ?, ?, ?)
+            """, (staff_id, timestamp, to_epoch(timestamp), action, document_name))
 
     # --- NEW METHODS FOR ADMIN DASHBOARD ---
 
@@ -44,8 +42,7 @@ class StaffRepository:
     def get_staff_with_login():
         """Returns all staff with their last login time."""
         try:
-            with sqlite3.connect(DB_PATHS["STAFF"]) as conn:
-                conn.row_factory = sqlite3.Row
+            with connect() as conn:
                 cursor = conn.execute("""
                     SELECT 
                         s.staff_id, 
@@ -61,51 +58,66 @@ class StaffRepository:
             print(f"Error fetching staff: {e}")
             return []
 
+    # Edit log rows joined with the editor's name
+    LOG_COLUMNS = """
+        el.log_id,
+        el.timestamp,
+        el.staff_id,
+        es.staff_name,
+        el.action_performed,
+        el.document_name
+    """
+    LOG_SOURCE = "edit_logs el LEFT JOIN staff_members es ON el.staff_id = es.staff_id"
+
+    # Shortest term the trigram index can match; shorter terms fall back to a LIKE scan
+    MIN_INDEXED_TERM = 3
+
     @staticmethod
-    def get_detailed_logs(search_term, filter_period):
+    def _log_filters(search_term, filter_period, start=None, end=None):
+        """
+        Search matches staff name, staff ID or document name as a substring, through the trigram index.
+        filter_period ('10days', '30days', 'all') and the inclusive start/end dates are index range scans on timestamp_epoch.
+        """
+        clauses, params = date_range_clauses("el.timestamp_epoch", start, end)
+
+        search_term = (search_term or '').strip()
+        if len(search_term) >= StaffRepository.MIN_INDEXED_TERM:
+            clauses.append("el.log_id IN (SELECT rowid FROM edit_logs_fts WHERE edit_logs_fts MATCH ?)")
+            # Quoted, so the term is matched literally rather than parsed as FTS syntax
+            params.append('"' + search_term.replace('"', '""') + '"')
+        elif search_term:
+            clauses.append("(IFNULL(es.staff_name, '') LIKE ? OR el.staff_id LIKE ? OR el.document_name LIKE ?)")
+            params.extend([f'%{search_term}%'] * 3)
+
+        # Date Logic
+        days = {'10days': 10, '30days': 30}.get(filter_period)
+        if days:
+            clauses.append("el.timestamp_epoch >= ?")
+            params.append(int(time.time()) - days * 86400)
+        return clauses, params
+
+    @staticmethod
+    def get_detailed_logs(search_term, filter_period, start=None, end=None):
         """Fetches logs with search and date filtering."""
         try:
-            # We need to attach the staff database to the logs database to join them
-            conn = sqlite3.connect(DB_PATHS["LOGS"])
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Attach Staff DB
-            cursor.execute("ATTACH DATABASE ? AS editor_staff", (DB_PATHS["STAFF"],))
-            
-            query = """
-                SELECT 
-                    el.log_id,
-                    el.timestamp,
-                    el.staff_id,
-                    es.staff_name,
-                    el.action_performed,
-                    el.document_name
-                FROM main.edit_logs el
-                LEFT JOIN editor_staff.staff_members es ON el.staff_id = es.staff_id
-                WHERE (IFNULL(es.staff_name, '') LIKE ? OR el.staff_id LIKE ?)
-            """
-            params = [f'%{search_term}%', f'%{search_term}%']
-            
-            # Date Logic
-            if filter_period == '10days':
-                cutoff = (datetime.now(IST) - timedelta(days=10)).isoformat()
-                query += " AND el.timestamp >= ?"
-                params.append(cutoff)
-            elif filter_period == '30days':
-                cutoff = (datetime.now(IST) - timedelta(days=30)).isoformat()
-                query += " AND el.timestamp >= ?"
-                params.append(cutoff)
-                
-            query += " ORDER BY el.timestamp DESC"
-            
-            cursor.execute(query, tuple(params))
-            logs = [dict(row) for row in cursor.fetchall()]
-            
-            # Detach and Close
-            cursor.execute("DETACH DATABASE editor_staff")
-            conn.close()
-            return logs
+            clauses, params = StaffRepository._log_filters(search_term, filter_period, start, end)
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+            with connect() as conn:
+                cursor = conn.execute(f"""
+                    SELECT {StaffRepository.LOG_COLUMNS}
+                    FROM {StaffRepository.LOG_SOURCE}
+                    {where}
+                    ORDER BY el.timestamp_epoch DESC, el.log_id DESC
+                """, params)
+                return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
             print(f"Error fetching logs: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    @staticmethod
+    def get_logs_page(cursor=None, limit=100, search_term='', filter_period='all', start=None, end=None):
+        """Newest-first page of edit logs with the same filters. Returns (logs, next_cursor); database errors propagate."""
+        clauses, params = StaffRepository._log_filters(search_term, filter_period, start, end)
+        with connect() as conn:
+            return keyset_page(conn, StaffRepository.LOG_SOURCE, "el.timestamp_epoch", "el.log_id",
+                               clauses, params, cursor, limit, columns=StaffRepository.LOG_COLUMNS)
@@ -0,0 +1,37 @@
+from datetime import datetime, date, time, timedelta
+import pytz
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# IST is a fixed +05:30 with no DST, so local buckets can be computed in SQL from the epoch alone:
+# strftime(format, epoch + IST_OFFSET_SECONDS, 'unixepoch')
+IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+
+
+def to_epoch(timestamp):
+    """ISO timestamp (as written by datetime.now(IST).isoformat()) -> integer Unix seconds. Naive values are taken as IST."""
+    moment = datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp
+    if moment.tzinfo is None:
+        moment = IST.localize(moment)
+    return int(moment.timestamp())
+
+
+def day_start(day):
+    """Epoch of IST midnight at the start of `day` (a date or YYYY-MM-DD)."""
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return to_epoch(datetime.combine(day, time.min))
+
+
+def day_range(start=None, end=None):
+    """Inclusive YYYY-MM-DD dates -> [low, high) epoch bounds; either side may be None."""
+    low = day_start(start) if start else None
+    high = day_start(date.fromisoformat(end) + timedelta(days=1)) if end else None
+    return low, high
+
+
+def month_range(period):
+    """'YYYY-MM' -> [low, high) epoch bounds of that IST month."""
+    first = date.fromisoformat(f"{period}-01")
+    following = (first + timedelta(days=31)).replace(day=1)
+    return day_start(first), day_start(following)
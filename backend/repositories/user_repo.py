@@ -1,18 +1,22 @@
-import sqlite3
-from core.constants import DB_PATHS
+from repositories.connection import connect
+from repositories.pagination import keyset_page, date_range_clauses
+from repositories.timestamps import to_epoch, day_range
 
 class UserRepository:
-    
+
+    # What the API returns; the *_epoch columns are for filtering and ordering only
+    COLUMNS = "id, user_name, email, phone_number, first_seen, last_seen"
+
     @staticmethod
     def save_otp(email, otp_hash, expires_at):
-        with sqlite3.connect(DB_PATHS["OTP"]) as conn:
+        with connect() as conn:
             conn.execute("DELETE FROM otp_requests WHERE email = ?", (email,))
             conn.execute("INSERT INTO otp_requests (email, otp_hash, expires_at) VALUES (?, ?, ?)", 
                          (email, otp_hash, expires_at))
     
     @staticmethod
     def verify_otp(email, otp_hash, current_time):
-        with sqlite3.connect(DB_PATHS["OTP"]) as conn:
+        with connect() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id FROM otp_requests WHERE email = ? AND otp_hash = ? AND expires_at > ?", 
                            (email, otp_hash, current_time))
@@ -20,26 +24,25 @@ class UserRepository:
 
     @staticmethod
     def get_user_by_email(email):
-        with sqlite3.connect(DB_PATHS["USERS"]) as conn:
-            conn.row_factory = sqlite3.Row
+        with connect() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM all_users WHERE email = ?", (email,))
+            cursor.execute(f"SELECT {UserRepository.COLUMNS} FROM all_users WHERE email = ?", (email,))
             row = cursor.fetchone()
             return dict(row) if row else None
 
     @staticmethod
     def create_or_update_user(email, name, phone, timestamp):
-        with sqlite3.connect(DB_PATHS["USERS"]) as conn:
-            cursor = conn.cursor()
+        with connect() as conn:
             # [MODIFIED] Use phone_number instead of email as identifier since email is no longer collected
-            cursor.execute("SELECT id FROM all_users WHERE phone_number = ?", (phone,))
-            if cursor.fetchone():
-                cursor.execute("UPDATE all_users SET last_seen = ? WHERE phone_number = ?", (timestamp, phone))
-                return "updated"
-            else:
-                cursor.execute("INSERT INTO all_users (user_name, email, phone_number, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)",
-                               (name, email, phone, timestamp, timestamp))
-                return "created"
+            # Single atomic upsert on the unique phone_number index; a returning user keeps their original first_seen
+            cursor = conn.execute("""
+                INSERT INTO all_users (user_name, email, phone_number, first_seen, last_seen, first_seen_epoch, last_seen_epoch)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (phone_number) DO UPDATE SET last_seen = excluded.last_seen, last_seen_epoch = excluded.last_seen_epoch
+                RETURNING first_seen
+            """, (name, email, phone, timestamp, timestamp, to_epoch(timestamp), to_epoch(timestamp)))
+            first_seen = cursor.fetchone()["first_seen"]
+            return "created" if first_seen == timestamp else "updated"
 
     # [COMMENTED OUT] Original email-based update_last_seen
     # @staticmethod
@@ -50,30 +53,34 @@ class UserRepository:
     # [NEW] Phone-based update_last_seen since email is no longer collected
     @staticmethod
     def update_last_seen_by_phone(phone, timestamp):
-        with sqlite3.connect(DB_PATHS["USERS"]) as conn:
-            conn.execute("UPDATE all_users SET last_seen = ? WHERE phone_number = ?", (timestamp, phone))
+        with connect() as conn:
+            conn.execute("UPDATE all_users SET last_seen = ?, last_seen_epoch = ? WHERE phone_number = ?",
+                         (timestamp, to_epoch(timestamp), phone))
 
     @staticmethod
-    def get_all_users():
-        """Fetches all users."""
-        try:
-            with sqlite3.connect(DB_PATHS["USERS"]) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute("SELECT * FROM all_users ORDER BY last_seen DESC")
-                return [dict(row) for row in cursor.fetchall()]
-        except Exception as e:
-            print(f"Error fetching users: {e}")
-            return []
+    def get_users_page(cursor=None, limit=100, start=None, end=None, phone=None):
+        """Page of users, most recently active first; start/end filter on last_seen. Returns (users, next_cursor); database errors propagate."""
+        clauses, params = date_range_clauses("last_seen_epoch", start, end)
+        if phone:
+            clauses.append("phone_number = ?")
+            params.append(phone)
+        with connect() as conn:
+            return keyset_page(conn, "all_users", "last_seen_epoch", "id", clauses, params, cursor, limit,
+                               columns=UserRepository.COLUMNS)
 
     # --- NEW: Fix for 'Today User' popup ---
     @staticmethod
     def get_today_users(date_str):
         """Fetches users active on a specific date (YYYY-MM-DD)."""
         try:
-            with sqlite3.connect(DB_PATHS["USERS"]) as conn:
-                conn.row_factory = sqlite3.Row
-                # Use LIKE to match the date part of the timestamp string
-                cursor = conn.execute("SELECT * FROM all_users WHERE last_seen LIKE ? ORDER BY last_seen DESC", (f"{date_str}%",))
+            with connect() as conn:
+                # The IST day as an epoch range: one scan of the last_seen_epoch index
+                low, high = day_range(date_str, date_str)
+                cursor = conn.execute(f"""
+                    SELECT {UserRepository.COLUMNS} FROM all_users
+                    WHERE last_seen_epoch >= ? AND last_seen_epoch < ?
+                    ORDER BY last_seen_epoch DESC
+                """, (low, high))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
             print(f"Error fetching today's users: {e}")
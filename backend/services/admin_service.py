@@ -4,6 +4,9 @@ from repositories.user_repo import UserRepository
 from repositories.escalation_repo import EscalationRepository
 from repositories.chat_repo import ChatRepository
 from repositories.staff_repo import StaffRepository
+from repositories.counter_repo import CounterRepository
+from repositories.search_repo import SearchRepository
+from repositories.analytics_repo import AnalyticsRepository
 
 IST = pytz.timezone('Asia/Kolkata')
 
@@ -11,30 +14,29 @@ class AdminService:
 
     @staticmethod
     def get_dashboard_stats():
-        users = UserRepository.get_all_users()
-        escalated = EscalationRepository.get_all_escalated()
-        
+        """Reads the trigger-maintained counters: four primary-key lookups, whatever the table sizes."""
         today_str = str(datetime.now(IST).date())
-        today_users = [u for u in users if u.get('last_seen', '').startswith(today_str)]
+        today_key = f"users_active:{today_str}"
+        counts = CounterRepository.get_counts(["users", today_key, "escalations:Initiated", "escalations:Finished"])
         
         return {
-            "totalUniqueUsers": len(users),
-            "todayUsers": len(today_users),
-            "totalEscalated": len([e for e in escalated if e.get('status') == 'Initiated']),
-            "totalSolved": len([e for e in escalated if e.get('status') == 'Finished'])
+            "totalUniqueUsers": counts["users"],
+            "todayUsers": counts[today_key],
+            "totalEscalated": counts["escalations:Initiated"],
+            "totalSolved": counts["escalations:Finished"]
         }
 
     @staticmethod
-    def get_escalations():
-        return EscalationRepository.get_all_escalated()
+    def get_escalations(cursor=None, limit=100, **filters):
+        return EscalationRepository.get_escalations_page(cursor, limit, **filters)
 
     @staticmethod
-    def get_all_users():
-        return UserRepository.get_all_users()
+    def get_all_users(cursor=None, limit=100, **filters):
+        return UserRepository.get_users_page(cursor, limit, **filters)
 
     @staticmethod
-    def get_all_chats():
-        return ChatRepository.get_all_chats()
+    def get_all_chats(cursor=None, limit=100, **filters):
+        return ChatRepository.get_chats_page(cursor, limit, **filters)
 
     @staticmethod
     def update_escalation(query_id, status, remarks):
@@ -53,55 +55,58 @@ class AdminService:
         return EscalationRepository.get_escalations_by_phone(phone)
 
     @staticmethod
-    def get_escalated_users_summary():
-        """Groups escalated queries by user."""
-        all_escalations = EscalationRepository.get_all_escalated()
-        pending = [e for e in all_escalations if e['status'] == 'Initiated']
-        
-        user_map = {}
-        for item in pending:
-            # [MODIFIED] Use phone_number instead of email as key since email is no longer collected
-            phone = item.get('phone_number')
-            if phone not in user_map:
-                user_map[phone] = {
-                    "user_name": item.get('user_name'),
-                    # "email": email, # [COMMENTED OUT] Email no longer collected
-                    "phone_number": phone,
-                    "query_count": 0
-                }
-            user_map[phone]['query_count'] += 1
-            
-        result = list(user_map.values())
-        result.sort(key=lambda x: x['query_count'], reverse=True)
-        return result
+    def get_users_summary(status, limit=None, offset=0):
+        """Groups queries with the given status by user (phone number), most queries first."""
+        # [MODIFIED] Grouped by phone_number since email is no longer collected
+        return EscalationRepository.get_user_summary(status, limit, offset)
 
     @staticmethod
-    def get_solved_users_summary():
-        """Groups solved queries by user."""
-        all_escalations = EscalationRepository.get_all_escalated()
-        solved = [e for e in all_escalations if e['status'] == 'Finished']
-        
-        user_map = {}
-        for item in solved:
-            # [MODIFIED] Use phone_number instead of email as key since email is no longer collected
-            phone = item.get('phone_number')
-            if phone not in user_map:
-                user_map[phone] = {
-                    "user_name": item.get('user_name'),
-                    # "email": email, # [COMMENTED OUT] Email no longer collected
-                    "phone_number": phone,
-                    "query_count": 0
-                }
-            user_map[phone]['query_count'] += 1
-            
-        result = list(user_map.values())
-        result.sort(key=lambda x: x['query_count'], reverse=True)
-        return result
+    def get_escalated_users_summary(limit=None, offset=0):
+        return AdminService.get_users_summary('Initiated', limit, offset)
+
+    @staticmethod
+    def get_solved_users_summary(limit=None, offset=0):
+        return AdminService.get_users_summary('Finished', limit, offset)
 
     @staticmethod
     def get_editor_staff():
         return StaffRepository.get_staff_with_login()
 
     @staticmethod
-    def get_editor_logs(search_term, filter_period):
-        return StaffRepository.get_detailed_logs(search_term, filter_period)
\ No newline at end of file
+    def get_editor_logs(search_term, filter_period, start=None, end=None):
+        return StaffRepository.get_detailed_logs(search_term, filter_period, start, end)
+
+    @staticmethod
+    def search(source, text, limit=20, offset=0, **filters):
+        """Full-text search over chat history or escalations. Returns (results, has_more)."""
+        return SearchRepository.search(source, text, limit, offset, **filters)
+
+    @staticmethod
+    def _with_rates(item):
+        """Adds escalation_rate (escalations per query) and avg_resolution_hours to a rollup total."""
+        item["escalation_rate"] = round(item["escalations"] / item["queries"], 4) if item["queries"] else None
+        item["avg_resolution_hours"] = (
+            round(item["resolution_seconds"] / item["resolved"] / 3600, 2) if item["resolved"] else None
+        )
+        del item["resolution_seconds"]
+        return item
+
+    @staticmethod
+    def get_analytics(granularity, start=None, end=None):
+        """
+        Trends between two dates (inclusive; default the last 30 days), read from the rollup tables only.
+        New rows are folded into the rollups first; that step only reads rows past the watermarks.
+        """
+        end = end or datetime.now(IST).date()
+        start = start or end - timedelta(days=29)
+        AnalyticsRepository.refresh()
+
+        series = [AdminService._with_rates(item) for item in AnalyticsRepository.get_series(granularity, start, end)]
+        categories = [AdminService._with_rates(item) for item in AnalyticsRepository.get_category_totals(start, end)]
+        return {
+            "granularity": granularity,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "series": series,
+            "categories": categories,
+        }
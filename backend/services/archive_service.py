@@ -0,0 +1,197 @@
+import io
+import os
+import time
+import uuid
+import gzip
+import json
+import hashlib
+from datetime import datetime
+import pytz
+from core.config import Config
+from core.constants import ARCHIVE_DIR
+from repositories.archive_repo import ArchiveRepository
+from repositories.timestamps import to_epoch, day_range
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# Rows read from the database per batch while writing an archive
+ARCHIVE_BATCH = 1000
+
+# Archived with each row for range filtering, but not part of what query_archived_chats() returns
+EPOCH_FIELDS = ("timestamp_epoch",)
+
+
+class ArchiveService:
+    """
+    Keeps chat_history small: rows older than CHAT_RETENTION_DAYS are written to monthly
+    compressed NDJSON files under data/archive, recorded in archive_manifest, and only then
+    deleted from the database; the freed pages are returned to the filesystem (incremental vacuum).
+    Archived rows stay readable through query_archived_chats().
+    """
+
+    SUFFIXES = {"gzip": "gz", "zstd": "zst"}
+
+    @staticmethod
+    def _compression():
+        if Config.ARCHIVE_COMPRESSION == "zstd":
+            try:
+                import zstandard  # noqa: F401
+                return "zstd"
+            except ImportError:
+                print("Warning: zstandard is not installed; archiving with gzip instead.")
+        return "gzip"
+
+    @staticmethod
+    def _open_writer(path, compression):
+        if compression == "zstd":
+            import zstandard
+            return zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb"))
+        return gzip.open(path, "wb", compresslevel=6)
+
+    @staticmethod
+    def _open_reader(path, compression):
+        if compression == "zstd":
+            import zstandard
+            return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), encoding="utf-8")
+        return gzip.open(path, "rt", encoding="utf-8")
+
+    @staticmethod
+    def _sha256(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _write_period(period, cutoff, compression, run_stamp):
+        """Writes the period's old rows to a new archive file. Returns its manifest entry, or None if there were none."""
+        # The random suffix keeps runs started within the same second from picking the same name
+        file_name = (f"chat_history-{period}-{run_stamp}-{uuid.uuid4().hex[:8]}"
+                     f".ndjson.{ArchiveService.SUFFIXES[compression]}")
+        path = os.path.join(ARCHIVE_DIR, file_name)
+        tmp_path = path + ".part"
+
+        entry = {"row_count": 0, "min_id": None, "max_id": None, "min_timestamp": None, "max_timestamp": None,
+                 "min_epoch": None, "max_epoch": None}
+        writer = ArchiveService._open_writer(tmp_path, compression)
+        try:
+            for rows in ArchiveRepository.iter_rows(period, cutoff, ARCHIVE_BATCH):
+                writer.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8"))
+                entry["row_count"] += len(rows)
+                entry["min_id"] = entry["min_id"] or rows[0]["id"]
+                entry["max_id"] = rows[-1]["id"]
+                # Rows are in id order, which is not strictly timestamp order
+                oldest = min(rows, key=lambda row: row["timestamp_epoch"])
+                newest = max(rows, key=lambda row: row["timestamp_epoch"])
+                if entry["min_epoch"] is None or oldest["timestamp_epoch"] < entry["min_epoch"]:
+                    entry["min_epoch"], entry["min_timestamp"] = oldest["timestamp_epoch"], oldest["timestamp"]
+                if entry["max_epoch"] is None or newest["timestamp_epoch"] > entry["max_epoch"]:
+                    entry["max_epoch"], entry["max_timestamp"] = newest["timestamp_epoch"], newest["timestamp"]
+        finally:
+            writer.close()
+
+        if not entry["row_count"]:
+            os.remove(tmp_path)
+            return None
+        # The rows are deleted right after this, so the file must be on disk first
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        # link() fails if the name exists, so a committed archive can never be overwritten (os.replace would)
+        try:
+            os.link(tmp_path, path)
+        finally:
+            os.remove(tmp_path)
+
+        entry.update({
+            "table_name": "chat_history",
+            "period": period,
+            "file_name": file_name,
+            "compression": compression,
+            "sha256": ArchiveService._sha256(path),
+            "created_at": datetime.now(IST).isoformat(),
+        })
+        return entry
+
+    @staticmethod
+    def _discard(file_name):
+        """Deletes an archive file whose commit failed, unless a manifest row references it."""
+        if ArchiveRepository.is_recorded(file_name):
+            print(f"Archive {file_name} is in the manifest; kept.")
+            return
+        try:
+            os.remove(os.path.join(ARCHIVE_DIR, file_name))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def archive_old_chats(retention_days=None):
+        """Moves chat rows older than the retention period into archive files. Returns a summary."""
+        retention_days = Config.CHAT_RETENTION_DAYS if retention_days is None else retention_days
+        cutoff = int(time.time()) - retention_days * 86400
+        compression = ArchiveService._compression()
+        run_stamp = datetime.now(IST).strftime("%Y%m%d%H%M%S")
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+
+        summary = {"archived_rows": 0, "files": [], "freed_pages": 0}
+        for period in ArchiveRepository.months_before(cutoff):
+            entry = ArchiveService._write_period(period, cutoff, compression, run_stamp)
+            if entry is None:
+                continue
+            try:
+                committed = ArchiveRepository.commit_archive(entry, cutoff)
+            except Exception:
+                # Nothing was deleted or recorded, so the file must not outlive the failed commit
+                ArchiveService._discard(entry["file_name"])
+                raise
+            if committed:
+                summary["archived_rows"] += entry["row_count"]
+                summary["files"].append(entry["file_name"])
+            else:
+                # Rows changed while the file was written; leave them in the database for the next run
+                print(f"Archive {entry['file_name']} no longer matches the database; discarded.")
+                ArchiveService._discard(entry["file_name"])
+        if summary["archived_rows"]:
+            summary["freed_pages"] = ArchiveRepository.reclaim_space()
+            print(f"Archived {summary['archived_rows']} chat rows into {len(summary['files'])} files; "
+                  f"freed {summary['freed_pages']} database pages.")
+        return summary
+
+    @staticmethod
+    def list_archives():
+        return ArchiveRepository.list_archives()
+
+    @staticmethod
+    def query_archived_chats(start=None, end=None, phone=None, category=None, limit=100, offset=0):
+        """
+        Reads archived chats on demand, oldest first. Only files whose manifest range overlaps
+        start/end (inclusive YYYY-MM-DD, IST days) are opened, and they are streamed line by line.
+        Returns (chats, has_more).
+        """
+        low, high = day_range(start, end)
+        results, skipped = [], 0
+        for entry in ArchiveRepository.list_archives(start, end):
+            path = os.path.join(ARCHIVE_DIR, entry["file_name"])
+            if not os.path.exists(path):
+                print(f"Archive file missing: {entry['file_name']}")
+                continue
+            with ArchiveService._open_reader(path, entry["compression"]) as reader:
+                for line in reader:
+                    row = json.loads(line)
+                    # Files written before the epoch columns existed only have the ISO timestamp
+                    epoch = row.get("timestamp_epoch")
+                    if epoch is None:
+                        epoch = to_epoch(row["timestamp"])
+                    if (low is not None and epoch < low) or (high is not None and epoch >= high):
+                        continue
+                    if (phone and row.get("phone_number") != phone) or (category and row.get("category") != category):
+                        continue
+                    if skipped < offset:
+                        skipped += 1
+                        continue
+                    for field in EPOCH_FIELDS:
+                        row.pop(field, None)
+                    results.append(row)
+                    if len(results) > limit:
+                        return results[:limit], True
+        return results, False
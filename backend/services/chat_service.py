@@ -5,18 +5,29 @@ from repositories.escalation_repo import EscalationRepository
 from repositories.user_repo import UserRepository
 from infrastructure.llm_client import LLMClient
 from infrastructure.email_service import EmailService
+from infrastructure.warmup import Warmup
+from core.config import Config
 
 IST = pytz.timezone('Asia/Kolkata')
 TRIGGER_MESSAGE = "We have received your query, soon our concerned department will contact you. Thank You!"
+WARMING_UP_MESSAGE = "I'm just getting started and still loading the BIT knowledge base. Please ask again in a few seconds."
 
 class ChatService:
     
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: LLMClient, warmup: Warmup):
         self.llm_client = llm_client
+        self.warmup = warmup
 
     def process_query(self, user_name, email, phone, query):
         if not query:
             return {"error": "Query is required"}, 400
+
+        # Right after a restart the index may still be loading: wait briefly, then ask the user to retry.
+        # A failed warmup falls through so get_answer reports the knowledge base error.
+        if not self.warmup.finished.is_set():
+            self.warmup.wait(Config.CHAT_WARMUP_WAIT)
+            if not self.warmup.finished.is_set():
+                return {"answer": WARMING_UP_MESSAGE, "warming_up": True}
             
         # 1. Update Last Seen
         timestamp = datetime.now(IST).isoformat()
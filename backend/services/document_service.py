@@ -1,27 +1,22 @@
 import os
 from datetime import datetime
 import pytz
-import docx
-import pypdf
 from core.constants import DOCUMENTS_DIR
 from repositories.staff_repo import StaffRepository
-from infrastructure.vector_store import VectorStoreManager
+from infrastructure.sharded_index import ShardedIndexManager
+from infrastructure.file_handler import FileHandler
+from infrastructure.text_cache import TextCache
 
 IST = pytz.timezone('Asia/Kolkata')
 
 class DocumentService:
     
-    def __init__(self, vector_manager: VectorStoreManager):
+    def __init__(self, vector_manager: ShardedIndexManager):
         self.vector_manager = vector_manager
 
     def get_folders(self):
-        """Lists subfolders in documents directory."""
-        folders = ["Main Folder"]
-        if os.path.exists(DOCUMENTS_DIR):
-            for item in os.listdir(DOCUMENTS_DIR):
-                if os.path.isdir(os.path.join(DOCUMENTS_DIR, item)):
-                    folders.append(item)
-        return folders
+        """Lists subfolders in documents directory (each one has its own index shard)."""
+        return ShardedIndexManager.list_folders()
 
     def list_documents(self):
         """Lists all files recursively."""
@@ -40,20 +35,47 @@ class DocumentService:
         
         try:
             ext = os.path.splitext(filename)[1].lower()
-            if ext in ['.txt', '.md']:
-                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                    return f.read(), None
-            elif ext == '.docx':
-                doc = docx.Document(path)
-                return "\n".join([para.text for para in doc.paragraphs]), None
-            elif ext == '.pdf':
-                reader = pypdf.PdfReader(path)
-                return "\n".join([page.extract_text() for page in reader.pages]), None
+            if ext in FileHandler.SUPPORTED_FORMATS:
+                return FileHandler.extract_text(path), None
             else:
                 return f"--- Binary file ({ext}) cannot be edited directly ---", None
         except Exception as e:
             return None, f"Error reading file: {str(e)}"
 
+    def read_document_page(self, filename, page):
+        """
+        Returns (page dict, error) for one page of a document.
+        A cached document is read only up to the requested page. On a cache miss the whole
+        document is extracted once, so the text cache is filled and later pages are cheap.
+        """
+        path = os.path.join(DOCUMENTS_DIR, filename)
+        if not os.path.exists(path):
+            return None, "File not found"
+        if os.path.splitext(filename)[1].lower() not in FileHandler.SUPPORTED_FORMATS:
+            return None, "Paged preview is not available for this file type"
+
+        try:
+            total_pages = FileHandler.cached_page_count(path)
+            if total_pages is not None and not 1 <= page <= total_pages:
+                return None, f"Page must be between 1 and {total_pages}"
+
+            content, last_page = None, 0
+            for number, text in FileHandler.iter_pages(path):
+                last_page = number
+                if number == page:
+                    content = text
+                    if total_pages is not None:
+                        break
+            if total_pages is None:
+                total_pages = last_page
+            if content is None:
+                return None, f"Page must be between 1 and {total_pages}"
+            if not content.strip():
+                content = f"--- Page {page} has no extractable text (scanned image?) ---"
+            return {"content": content, "page": page, "total_pages": total_pages}, None
+        except Exception as e:
+            return None, f"Error reading file: {str(e)}"
+
     def save_document(self, filename, content, staff_id):
         if not filename.endswith(('.txt', '.md')):
             return False, "Only .txt and .md files can be edited."
@@ -62,6 +84,7 @@ class DocumentService:
         try:
             with open(path, 'w', encoding='utf-8') as f:
                 f.write(content)
+            TextCache.invalidate(path)
             
             self._log(staff_id, "Document Edited", filename)
             return True, "Saved successfully"
@@ -103,6 +126,7 @@ class DocumentService:
         
         try:
             file.save(path)
+            TextCache.invalidate(path)
             log_name = filename if folder == "Main Folder" else f"{folder}/{filename}"
             self._log(staff_id, "File Uploaded", log_name)
             return True, "File uploaded"
@@ -116,6 +140,7 @@ class DocumentService:
             
         try:
             os.remove(path)
+            TextCache.invalidate(path)
             self._log(staff_id, "Document Deleted", filename)
             return True, "Deleted successfully"
         except Exception as e:
@@ -130,11 +155,28 @@ class DocumentService:
         name = os.path.basename(path)
         return directory, name, None
 
-    def rebuild_index(self, staff_id):
-        success = self.vector_manager.rebuild_index()
-        if success:
-            self._log(staff_id, "Index Rebuilt", "All")
-        return success
+    def rebuild_index(self, staff_id, progress=None, folder=None):
+        """
+        Commits document changes to the index, re-embedding only what changed.
+        With folder set, only that folder's shard is updated.
+        Returns the update summary (including files that failed to parse), or False on failure.
+        """
+        scope = folder or "All"
+        summary = self.vector_manager.update_index(progress, folder)
+        if summary is None:
+            self._log(staff_id, "Index Update Failed", scope)
+            return False
+        self._log(staff_id, "Index Updated",
+                  f"{scope}: {summary['added']} added, {summary['updated']} updated, {summary['removed']} removed, "
+                  f"{len(summary['failed'])} failed")
+        return summary
+
+    def rollback_index(self, version, staff_id, folder="Main Folder"):
+        """Switches one folder's index shard back to an earlier version."""
+        live = self.vector_manager.rollback(version, folder)
+        if live:
+            self._log(staff_id, "Index Rolled Back", f"{folder}: {live}")
+        return live
 
     def _log(self, staff_id, action, doc_name):
         timestamp = datetime.now(IST).isoformat()
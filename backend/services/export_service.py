@@ -0,0 +1,101 @@
+import io
+import csv
+import json
+import zlib
+from core.config import Config
+from repositories.chat_repo import ChatRepository
+from repositories.escalation_repo import EscalationRepository
+from repositories.staff_repo import StaffRepository
+
+
+class ExportService:
+    """
+    Streams whole tables as CSV or NDJSON, optionally gzipped.
+    Rows are read in fixed-size keyset batches (a fresh short query per batch, so no long-lived
+    read transaction holds back WAL checkpoints) and written out batch by batch,
+    so memory use stays flat however many rows are exported.
+    """
+
+    # dataset -> (page function, CSV columns)
+    DATASETS = {
+        "chat_history": (
+            ChatRepository.get_chats_page,
+            ["id", "timestamp", "user_name", "email", "phone_number", "user_query", "bot_response", "category"],
+        ),
+        "escalated_queries": (
+            EscalationRepository.get_escalations_page,
+            ["id", "timestamp", "user_name", "email", "phone_number", "query_text", "bot_response",
+             "status", "remarks", "category"],
+        ),
+        "edit_logs": (
+            StaffRepository.get_logs_page,
+            ["log_id", "timestamp", "staff_id", "staff_name", "action_performed", "document_name"],
+        ),
+    }
+
+    FORMATS = {
+        "csv": "text/csv",
+        "ndjson": "application/x-ndjson",
+    }
+
+    @staticmethod
+    def iter_rows(dataset, **filters):
+        """
+        Yields the dataset in batches. A database error is re-raised, which aborts the response
+        mid-stream, so a failed export can't pass for a complete (truncated) file.
+        """
+        page_fn = ExportService.DATASETS[dataset][0]
+        cursor = None
+        while True:
+            try:
+                rows, cursor = page_fn(cursor, Config.EXPORT_BATCH_SIZE, **filters)
+            except Exception as e:
+                print(f"Error exporting {dataset}: {e}")
+                raise
+            yield rows
+            if not cursor:
+                break
+
+    @staticmethod
+    def _csv_chunks(batches, columns):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for rows in batches:
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @staticmethod
+    def _ndjson_chunks(batches):
+        for rows in batches:
+            if rows:
+                yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+    @staticmethod
+    def _gzip(chunks):
+        # wbits=31 writes a gzip header/trailer, so the stream is a valid .gz file
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode("utf-8"))
+            if data:
+                yield data
+        yield compressor.flush()
+
+    @staticmethod
+    def stream(dataset, fmt="csv", gzip=False, **filters):
+        """Returns (chunk generator, mimetype, filename) for a dataset export."""
+        columns = ExportService.DATASETS[dataset][1]
+        batches = ExportService.iter_rows(dataset, **filters)
+        if fmt == "ndjson":
+            chunks = ExportService._ndjson_chunks(batches)
+        else:
+            chunks = ExportService._csv_chunks(batches, columns)
+
+        filename = f"{dataset}.{fmt}"
+        if gzip:
+            return ExportService._gzip(chunks), "application/gzip", filename + ".gz"
+        return (chunk.encode("utf-8") for chunk in chunks), ExportService.FORMATS[fmt], filename
@@ -0,0 +1,109 @@
+import time
+import uuid
+import queue
+import threading
+from datetime import datetime
+import pytz
+from services.document_service import DocumentService
+from infrastructure.warmup import Warmup
+
+IST = pytz.timezone('Asia/Kolkata')
+
+
+class IndexJobService:
+    """
+    Runs index builds in the background, one at a time.
+    A commit while another build for the same scope (one folder or all) is already queued
+    returns the queued job instead of starting a duplicate; a commit while a build is running
+    queues one follow-up job so changes made during the build are not lost.
+    """
+
+    # Finished jobs kept for status lookups
+    MAX_JOBS = 50
+
+    def __init__(self, doc_service: DocumentService, warmup: Warmup):
+        self.doc_service = doc_service
+        self.warmup = warmup
+        self.jobs = {}
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        # Queued (not yet running) job per scope
+        self.pending_job_ids = {}
+        self.worker = threading.Thread(target=self._run, name="index-jobs", daemon=True)
+        self.worker.start()
+
+    def submit(self, staff_id, folder=None):
+        """Queues an index update (of one folder, or all) and returns its job dict (or the already queued one)."""
+        with self.lock:
+            if folder in self.pending_job_ids:
+                return self._snapshot(self.jobs[self.pending_job_ids[folder]])
+
+            job = {
+                "job_id": uuid.uuid4().hex,
+                "staff_id": staff_id,
+                "folder": folder,
+                "status": "queued",
+                "stage": "queued",
+                "percent": 0,
+                "submitted_at": datetime.now(IST).isoformat(),
+                "started": None,
+                "finished": None,
+                "error": None,
+                "summary": None,
+            }
+            self.jobs[job["job_id"]] = job
+            self.pending_job_ids[folder] = job["job_id"]
+            self.queue.put(job["job_id"])
+            self._prune()
+            return self._snapshot(job)
+
+    def _prune(self):
+        finished = [jid for jid, j in self.jobs.items() if j["status"] in ("completed", "failed")]
+        for job_id in finished[:max(0, len(self.jobs) - self.MAX_JOBS)]:
+            del self.jobs[job_id]
+
+    def get_job(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    @staticmethod
+    def _snapshot(job):
+        data = {k: v for k, v in job.items() if k not in ("started", "finished")}
+        if job["started"]:
+            data["elapsed_seconds"] = round((job["finished"] or time.monotonic()) - job["started"], 1)
+        else:
+            data["elapsed_seconds"] = 0
+        return data
+
+    def _update(self, job, **fields):
+        with self.lock:
+            job.update(fields)
+
+    def _run(self):
+        # Shards must be loaded before they can be updated incrementally
+        self.warmup.finished.wait()
+        while True:
+            job_id = self.queue.get()
+            with self.lock:
+                job = self.jobs[job_id]
+                # From here on, new submissions queue a fresh job instead of joining this one
+                self.pending_job_ids.pop(job["folder"], None)
+                job.update(status="running", stage="parsing", started=time.monotonic())
+
+            def progress(stage, percent):
+                self._update(job, stage=stage, percent=percent)
+
+            try:
+                # DocumentService logs the outcome through StaffRepository.log_action
+                summary = self.doc_service.rebuild_index(job["staff_id"], progress, job["folder"])
+                if summary:
+                    self._update(job, status="completed", stage="done", percent=100, summary=summary)
+                else:
+                    self._update(job, status="failed", error="Index update failed. Check server logs.")
+            except Exception as e:
+                print(f"Index job {job_id} crashed: {e}")
+                self._update(job, status="failed", error=str(e))
+            finally:
+                self._update(job, finished=time.monotonic())
+                self.queue.task_done()
@@ -0,0 +1,67 @@
+import time
+import threading
+from datetime import datetime
+import pytz
+
+IST = pytz.timezone('Asia/Kolkata')
+
+
+class MaintenanceService:
+    """
+    Runs periodic database upkeep jobs (counter reconciliation, rollups, archival)
+    one at a time in a single background thread. Jobs can also be triggered on demand.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def add_job(self, name, interval_seconds, target, run_at_start=False):
+        self.jobs[name] = {
+            "name": name,
+            "target": target,
+            "interval_seconds": interval_seconds,
+            "next_run": time.monotonic() + (0 if run_at_start else interval_seconds),
+            "last_run": None,
+            "last_result": None,
+            "last_error": None,
+        }
+
+    def start(self):
+        threading.Thread(target=self._loop, name="maintenance", daemon=True).start()
+
+    def _loop(self):
+        while True:
+            now = time.monotonic()
+            for job in list(self.jobs.values()):
+                if job["next_run"] <= now:
+                    self._run(job)
+            next_due = min((job["next_run"] for job in self.jobs.values()), default=now + 60)
+            time.sleep(max(next_due - time.monotonic(), 1))
+
+    def _run(self, job):
+        # The lock keeps scheduled and on-demand runs from overlapping
+        with self.lock:
+            try:
+                job["last_result"] = job["target"]()
+                job["last_error"] = None
+            except Exception as e:
+                print(f"Maintenance job {job['name']} failed: {e}")
+                job["last_error"] = str(e)
+            job["last_run"] = datetime.now(IST).isoformat()
+            job["next_run"] = time.monotonic() + job["interval_seconds"]
+        return job
+
+    def run_now(self, name):
+        """Runs a job immediately in the caller's thread. Returns its status, or None for an unknown job."""
+        job = self.jobs.get(name)
+        if job is None:
+            return None
+        return self._public(self._run(job))
+
+    @staticmethod
+    def _public(job):
+        return {key: value for key, value in job.items() if key not in ("target", "next_run")}
+
+    def status(self):
+        return [self._public(job) for job in self.jobs.values()]
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react'
+import React, { useState, useEffect, useMemo, useRef } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { 
   Lock, Mail, LogOut, Users, MessageSquare, Clock, CheckSquare, 
@@ -20,39 +20,71 @@ const Spinner = ({ size = 'h-12 w-12', borderColor = 'border-blue-600' }) => (
 const ChatHistoryModal = ({ onClose }) => {
   const [chats, setChats] = useState([])
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [nextCursor, setNextCursor] = useState(null)
   const [searchTerm, setSearchTerm] = useState('')
   const [categoryFilter, setCategoryFilter] = useState('All')
+  const [startDate, setStartDate] = useState('')
+  const [endDate, setEndDate] = useState('')
+  // Responses for filters that have since changed are dropped
+  const requestId = useRef(0)
+
+  // Category and dates are filtered by the server, so every page matches them; the search box filters loaded rows
+  const filterParams = () => ({
+    category: categoryFilter === 'All' ? undefined : categoryFilter,
+    start: startDate || undefined,
+    end: endDate || undefined,
+  })
 
   useEffect(() => {
     fetchChatHistory()
-  }, [])
+  }, [categoryFilter, startDate, endDate])
 
+  // Starts again from the first page, dropping the cursor of the previous filters
   const fetchChatHistory = async () => {
+    const id = ++requestId.current
     setLoading(true)
+    setNextCursor(null)
     try {
-      const response = await axios.get('/api/admin/chat-history')
+      const response = await axios.get('/api/admin/chat-history', { params: filterParams() })
+      if (id !== requestId.current) return
       setChats(response.data)
+      setNextCursor(response.headers['x-next-cursor'] || null)
     } catch (error) {
+      if (id !== requestId.current) return
       console.error('Error fetching chat history:', error)
       setChats([]) 
+      setNextCursor(null)
     } finally {
-      setLoading(false)
+      if (id === requestId.current) setLoading(false)
+    }
+  }
+
+  // The endpoint is paginated; X-Next-Cursor points at the next (older) page
+  const loadMoreChats = async () => {
+    const id = requestId.current
+    setLoadingMore(true)
+    try {
+      const response = await axios.get('/api/admin/chat-history', { params: { ...filterParams(), cursor: nextCursor } })
+      if (id !== requestId.current) return
+      setChats(prev => [...prev, ...response.data])
+      setNextCursor(response.headers['x-next-cursor'] || null)
+    } catch (error) {
+      console.error('Error loading more chat history:', error)
+    } finally {
+      setLoadingMore(false)
     }
   }
 
   const categories = ['All', 'Admission', 'Hostel', 'Campus-Facility', 'Placement', 'General']
 
   const filteredChats = useMemo(() => {
-    return chats.filter(chat => {
-      const matchesSearch = 
-        (chat.user_name && chat.user_name.toLowerCase().includes(searchTerm.toLowerCase())) ||
-        // (chat.email && chat.email.toLowerCase().includes(searchTerm.toLowerCase())) || // [COMMENTED OUT] Email no longer collected
-        (chat.user_query && chat.user_query.toLowerCase().includes(searchTerm.toLowerCase()))
-      
-      const matchesCategory = categoryFilter === 'All' || (chat.category && chat.category === categoryFilter)
-      return matchesSearch && matchesCategory
-    })
-  }, [chats, searchTerm, categoryFilter])
+    return chats.filter(chat => 
+      (chat.user_name && chat.user_name.toLowerCase().includes(searchTerm.toLowerCase())) ||
+      // (chat.email && chat.email.toLowerCase().includes(searchTerm.toLowerCase())) || // [COMMENTED OUT] Email no longer collected
+      (chat.user_query && chat.user_query.toLowerCase().includes(searchTerm.toLowerCase()))
+    )
+  }, [chats, searchTerm])
 
   const handleDownload = () => {
     const headers = ['Timestamp', 'Category', 'User Name', 'Phone', 'Query', 'Response']  // [MODIFIED] Email removed
@@ -114,6 +146,8 @@ const ChatHistoryModal = ({ onClose }) => {
                 className="w-full pl-10 pr-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 outline-none"
               />
             </div>
+            <input type="date" value={startDate} max={endDate || undefined} onChange={(e) => setStartDate(e.target.value)} title="From" className="border border-gray-300 rounded-lg px-3 py-2 focus:ring-2 focus:ring-indigo-500 outline-none" />
+            <input type="date" value={endDate} min={startDate || undefined} onChange={(e) => setEndDate(e.target.value)} title="To" className="border border-gray-300 rounded-lg px-3 py-2 focus:ring-2 focus:ring-indigo-500 outline-none" />
             <button onClick={fetchChatHistory} className="flex items-center justify-center space-x-2 bg-white border border-gray-300 hover:bg-gray-100 px-4 py-2 rounded-lg">
               <RotateCw size={18} /> <span>Refresh</span>
             </button>
@@ -160,6 +194,13 @@ const ChatHistoryModal = ({ onClose }) => {
               </tbody>
             </table>
           )}
+          {!loading && nextCursor && (
+            <div className="text-center py-4">
+              <button onClick={loadMoreChats} disabled={loadingMore} className="bg-indigo-600 hover:bg-indigo-700 text-white px-6 py-2 rounded-lg disabled:opacity-50">
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -466,14 +507,42 @@ const EditorDetailsModal = ({ onClose }) => {
 }
 
 // --- Generic User List Modal (Today / All Users) ---
-const GenericUserListModal = ({ title, color, endpoint, onClose }) => {
+// dateFilter: show From/To inputs, sent as start/end (last seen) to endpoints that support them (all-users)
+const GenericUserListModal = ({ title, color, endpoint, onClose, dateFilter = false }) => {
   const [users, setUsers] = useState([])
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [nextCursor, setNextCursor] = useState(null)
   const [selectedUser, setSelectedUser] = useState(null)
+  const [startDate, setStartDate] = useState('')
+  const [endDate, setEndDate] = useState('')
+  // Responses for filters that have since changed are dropped
+  const requestId = useRef(0)
 
+  const filterParams = () => ({ start: startDate || undefined, end: endDate || undefined })
+
+  // Starts again from the first page whenever the endpoint or dates change
   useEffect(() => {
-    axios.get(endpoint).then(r => setUsers(r.data)).catch(console.error).finally(() => setLoading(false))
-  }, [endpoint])
+    const id = ++requestId.current
+    setLoading(true)
+    setNextCursor(null)
+    axios.get(endpoint, { params: filterParams() }).then(r => {
+      if (id !== requestId.current) return
+      setUsers(r.data)
+      setNextCursor(r.headers['x-next-cursor'] || null)
+    }).catch(console.error).finally(() => { if (id === requestId.current) setLoading(false) })
+  }, [endpoint, startDate, endDate])
+
+  // Paginated endpoints (all-users) send X-Next-Cursor while older pages remain
+  const loadMoreUsers = () => {
+    const id = requestId.current
+    setLoadingMore(true)
+    axios.get(endpoint, { params: { ...filterParams(), cursor: nextCursor } }).then(r => {
+      if (id !== requestId.current) return
+      setUsers(prev => [...prev, ...r.data])
+      setNextCursor(r.headers['x-next-cursor'] || null)
+    }).catch(console.error).finally(() => setLoadingMore(false))
+  }
 
   if (selectedUser) return <UserDetailsModal user={selectedUser} onClose={() => setSelectedUser(null)} />
 
@@ -484,6 +553,14 @@ const GenericUserListModal = ({ title, color, endpoint, onClose }) => {
           <h3 className="text-2xl font-bold text-white">{title}</h3>
           <button onClick={onClose} className="text-white hover:bg-white/20 rounded-full p-2"><X size={24} /></button>
         </div>
+        {dateFilter && (
+          <div className="px-6 py-3 bg-gray-50 border-b flex items-center gap-3 text-sm text-gray-600">
+            <span>Last seen</span>
+            <input type="date" value={startDate} max={endDate || undefined} onChange={e => setStartDate(e.target.value)} title="From" className={`border rounded-lg px-3 py-2 focus:ring-2 focus:ring-${color}-500 outline-none`} />
+            <span>to</span>
+            <input type="date" value={endDate} min={startDate || undefined} onChange={e => setEndDate(e.target.value)} title="To" className={`border rounded-lg px-3 py-2 focus:ring-2 focus:ring-${color}-500 outline-none`} />
+          </div>
+        )}
         <div className="p-6 overflow-y-auto max-h-[calc(90vh-100px)]">
            {loading ? <div className="py-12"><Spinner borderColor={`border-${color}-600`}/></div> : users.length === 0 ? <div className="text-center py-12 text-gray-500">No users found</div> : (
              <div className="space-y-3">
@@ -495,6 +572,13 @@ const GenericUserListModal = ({ title, color, endpoint, onClose }) => {
                ))}
              </div>
            )}
+           {!loading && nextCursor && (
+             <div className="text-center pt-4">
+               <button onClick={loadMoreUsers} disabled={loadingMore} className={`bg-${color}-600 hover:bg-${color}-700 text-white px-6 py-2 rounded-lg disabled:opacity-50`}>
+                 {loadingMore ? 'Loading...' : 'Load more'}
+               </button>
+             </div>
+           )}
         </div>
       </div>
     </div>
@@ -621,7 +705,7 @@ const AdminPage = () => {
       )}
 
       {activeModal === 'today' && <GenericUserListModal title="Today's Active Users" color="blue" endpoint="/api/admin/today-users" onClose={() => setActiveModal(null)} />}
-      {activeModal === 'all' && <GenericUserListModal title="All Registered Users" color="purple" endpoint="/api/admin/all-users" onClose={() => setActiveModal(null)} />}
+      {activeModal === 'all' && <GenericUserListModal title="All Registered Users" color="purple" endpoint="/api/admin/all-users" dateFilter onClose={() => setActiveModal(null)} />}
       {activeModal === 'editor' && <EditorDetailsModal onClose={() => setActiveModal(null)} />}
       {activeModal === 'chat' && <ChatHistoryModal onClose={() => setActiveModal(null)} />}
       
@@ -418,6 +418,7 @@ const EditorInterface = ({ staffId, sessionId, onLogout }) => {
   const [isEditorLoading, setIsEditorLoading] = useState(false)
   const [isSaving, setIsSaving] = useState(false)
   const [isCommitting, setIsCommitting] = useState(false)
+  const [commitProgress, setCommitProgress] = useState(null) // { stage, percent } of the running index job
   
   const [newFileName, setNewFileName] = useState('')
   const [isCreating, setIsCreating] = useState(false)
@@ -623,10 +624,24 @@ const EditorInterface = ({ staffId, sessionId, onLogout }) => {
       const response = await axios.post('/api/editor/commit-index', {
         staff_id: staffId
       })
-      showToast(response.data.message, 'success')
+      // The build runs in the background (202 + job_id); poll it until it finishes
+      let job = { status: 'queued', stage: 'queued', percent: 0 }
+      while (job.status !== 'completed' && job.status !== 'failed') {
+        setCommitProgress({ stage: job.stage, percent: job.percent })
+        await new Promise(resolve => setTimeout(resolve, 2000))
+        job = (await axios.get(`/api/editor/index-jobs/${response.data.job_id}`)).data
+      }
+      if (job.status === 'failed') {
+        showToast(`Index update failed: ${job.error || 'unknown error'}`, 'error')
+      } else if (job.summary?.failed?.length) {
+        showToast(`Index updated, but ${job.summary.failed.length} file(s) failed to parse`, 'error')
+      } else {
+        showToast('Index updated successfully', 'success')
+      }
     } catch (err) {
       showToast(err.response?.data?.error || 'Failed to commit changes', 'error')
     } finally {
+      setCommitProgress(null)
       setIsCommitting(false)
     }
   }
@@ -713,7 +728,7 @@ const EditorInterface = ({ staffId, sessionId, onLogout }) => {
               title="Rebuild the RAG index with all changes"
             >
               {isCommitting ? <Spinner /> : <UploadCloud size={18} />}
-              <span>Commit to RAG</span>
+              <span>{commitProgress ? `${commitProgress.stage} ${commitProgress.percent}%` : 'Commit to RAG'}</span>
             </button>
           </div>
 
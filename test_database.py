@@ -0,0 +1,337 @@
+"""
+Database tests for the backend: schema migrations, chat history archival and analytics rollups.
+Each test runs against a fresh SQLite file in a temporary directory.
+
+Run from the repository root:
+    python -m pytest test_database.py
+"""
+import os
+import sys
+import time
+import sqlite3
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+# Config exits without these; nothing is contacted
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("email_id", "test@example.com")
+
+from repositories import connection, migrations  # noqa: E402
+from repositories.counter_repo import CounterRepository  # noqa: E402
+from repositories.user_repo import UserRepository  # noqa: E402
+from repositories.chat_repo import ChatRepository  # noqa: E402
+from repositories.escalation_repo import EscalationRepository  # noqa: E402
+from repositories.archive_repo import ArchiveRepository  # noqa: E402
+from repositories.analytics_repo import AnalyticsRepository  # noqa: E402
+from repositories import analytics_repo  # noqa: E402
+from services import archive_service  # noqa: E402
+from services.archive_service import ArchiveService  # noqa: E402
+
+LATEST = migrations.MIGRATIONS[-1][0]
+
+
+@pytest.fixture
+def legacy_paths(tmp_path, monkeypatch):
+    """Points the legacy per-entity database files at the temporary directory (none exist yet)."""
+    paths = {key: str(tmp_path / f"legacy_{key.lower()}.db") for key in migrations.LEGACY_TABLES}
+    monkeypatch.setattr(migrations, "LEGACY_DB_PATHS", paths)
+    return paths
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch, legacy_paths):
+    """Makes connect() (and so every repository) use a new, unmigrated database file."""
+    monkeypatch.setattr(connection.connect, "__defaults__", (str(tmp_path / "test.db"),))
+    yield connection.connect()
+    connection.close_all()
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    path = tmp_path / "archive"
+    monkeypatch.setattr(archive_service, "ARCHIVE_DIR", str(path))
+    return path
+
+
+def _names(conn, kind):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = ?", (kind,))}
+
+
+# --- Migrations ---
+
+def test_fresh_database_migrates_to_latest(db):
+    assert migrations.migrate(db) == LATEST
+    assert [row[0] for row in db.execute("SELECT version FROM schema_version ORDER BY version")] == \
+        list(range(1, LATEST + 1))
+
+    tables = _names(db, "table")
+    for table in ("all_users", "chat_history", "escalated_queries", "edit_logs", "dashboard_counters",
+                  "chat_history_fts", "analytics_rollups", "analytics_watermarks", "archive_manifest"):
+        assert table in tables
+    indexes = _names(db, "index")
+    assert "idx_escalated_queries_status_phone_epoch" in indexes
+    assert "idx_escalated_queries_status_phone" not in indexes
+    assert {"min_epoch", "max_epoch"} <= set(migrations._columns(db, "archive_manifest"))
+
+    # Already up to date: nothing is applied twice
+    assert migrations.migrate(db) == LATEST
+
+
+def test_legacy_files_are_imported(db, legacy_paths):
+    users = sqlite3.connect(legacy_paths["USERS"])
+    users.execute("""
+        CREATE TABLE all_users (id INTEGER PRIMARY KEY, user_name TEXT, email TEXT, phone_number TEXT,
+                                first_seen TEXT NOT NULL, last_seen TEXT NOT NULL)
+    """)
+    # Written in UTC: 23:00 on Jan 1 is already Jan 2 in IST
+    users.execute("INSERT INTO all_users VALUES (7, 'Asha', '', '900', '2024-01-01T23:00:00+00:00', "
+                  "'2024-01-01T23:00:00+00:00')")
+    users.commit()
+    users.close()
+
+    chats = sqlite3.connect(legacy_paths["CHATS"])
+    # Old files predate the category column
+    chats.execute("""
+        CREATE TABLE chat_history (id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, user_name TEXT, email TEXT,
+                                   phone_number TEXT, user_query TEXT, bot_response TEXT)
+    """)
+    chats.execute("INSERT INTO chat_history VALUES (3, '2024-01-02T10:00:00', 'Asha', '', '900', 'q', 'r')")
+    chats.commit()
+    chats.close()
+
+    assert migrations.migrate(db) == LATEST
+
+    user = db.execute("SELECT * FROM all_users").fetchone()
+    assert (user["id"], user["last_seen_epoch"]) == (7, 1704150000)
+    chat = db.execute("SELECT * FROM chat_history").fetchone()
+    # Naive timestamps are IST
+    assert (chat["id"], chat["category"], chat["timestamp_epoch"]) == (3, None, 1704169800)
+    assert CounterRepository.get_counts(["users", "users_active:2024-01-02"]) == \
+        {"users": 1, "users_active:2024-01-02": 1}
+    assert CounterRepository.reconcile() == 0
+
+
+def test_upgrade_keys_user_counters_by_ist_day(db):
+    migrations.migrate(db, target=13)
+    db.execute("""
+        INSERT INTO all_users (user_name, email, phone_number, first_seen, last_seen, first_seen_epoch, last_seen_epoch)
+        VALUES ('Asha', '', '900', '2024-01-01T23:00:00+00:00', '2024-01-01T23:00:00+00:00', 1704150000, 1704150000)
+    """)
+    db.execute("""
+        INSERT INTO archive_manifest (table_name, period, file_name, compression, row_count, min_id, max_id,
+                                      min_timestamp, max_timestamp, sha256, created_at)
+        VALUES ('chat_history', '2023-01', 'old.ndjson.gz', 'gzip', 1, 1, 1,
+                '2023-01-10T10:00:00+05:30', '2023-01-31T23:00:00', '', '')
+    """)
+    db.commit()
+    # Migration 6 bucketed by the first ten characters of last_seen
+    assert CounterRepository.get_counts(["users_active:2024-01-01"])["users_active:2024-01-01"] == 1
+
+    assert migrations.migrate(db) == LATEST
+    assert CounterRepository.get_counts(["users_active:2024-01-01", "users_active:2024-01-02"]) == \
+        {"users_active:2024-01-01": 0, "users_active:2024-01-02": 1}
+    manifest = db.execute("SELECT min_epoch, max_epoch FROM archive_manifest").fetchone()
+    assert tuple(manifest) == (1673325000, 1675186200)
+
+    # The new triggers follow last_seen_epoch across IST days
+    UserRepository.update_last_seen_by_phone("900", "2024-01-03T09:00:00+05:30")
+    assert CounterRepository.get_counts(["users_active:2024-01-02", "users_active:2024-01-03"]) == \
+        {"users_active:2024-01-02": 0, "users_active:2024-01-03": 1}
+    assert CounterRepository.reconcile() == 0
+
+
+def test_failed_migration_leaves_previous_version(db, monkeypatch):
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [(LATEST + 1, "broken", broken)])
+    with pytest.raises(RuntimeError):
+        migrations.migrate(db)
+    assert migrations.current_version(db) == LATEST
+    assert "half_done" not in _names(db, "table")
+
+
+def test_api_rows_have_no_epoch_columns(db):
+    migrations.migrate(db)
+    UserRepository.create_or_update_user("", "Asha", "900", "2024-01-02T10:00:00+05:30")
+    for day in (1, 2, 3):
+        ChatRepository.save_chat(f"2024-01-0{day}T10:00:00+05:30", "Asha", "", "900", "q", "r", "General")
+        EscalationRepository.add_escalation(f"2024-01-0{day}T10:00:00+05:30", "Asha", "", "900", "q", "r", "General")
+
+    chats, cursor = ChatRepository.get_chats_page(limit=2)
+    assert [chat["id"] for chat in chats] == [3, 2] and cursor
+    assert [chat["id"] for chat in ChatRepository.get_chats_page(cursor=cursor, limit=2)[0]] == [1]
+    rows = chats + UserRepository.get_users_page()[0] + EscalationRepository.get_escalations_page()[0] + \
+        EscalationRepository.get_escalations_by_phone("900") + UserRepository.get_today_users("2024-01-02")
+    assert rows and not [key for row in rows for key in row if key.endswith("_epoch") or key == "_sort_key"]
+
+    assert EscalationRepository.get_user_summary("Initiated") == [
+        {"phone_number": "900", "user_name": "Asha", "query_count": 3, "last_query_at": "2024-01-03T10:00:00+05:30"}
+    ]
+
+
+# --- Archival ---
+
+def _old_chats(count, month="2023-01"):
+    for n in range(count):
+        ChatRepository.save_chat(f"{month}-{10 + n:02d}T10:00:00+05:30", "Asha", "", "900", f"q{n}", "r", "General")
+
+
+def _chat_ids(conn):
+    return [row[0] for row in conn.execute("SELECT id FROM chat_history ORDER BY id")]
+
+
+def test_archive_moves_old_rows_into_files(db, archive_dir):
+    migrations.migrate(db)
+    _old_chats(3, "2023-01")
+    _old_chats(2, "2023-02")
+    ChatRepository.save_chat("2099-01-01T10:00:00+05:30", "Asha", "", "900", "recent", "r", "General")
+
+    summary = ArchiveService.archive_old_chats(retention_days=30)
+    assert summary["archived_rows"] == 5 and len(summary["files"]) == 2
+    assert _chat_ids(db) == [6]
+    assert sorted(os.listdir(archive_dir)) == sorted(summary["files"])
+
+    manifest = ArchiveService.list_archives()
+    assert [(entry["period"], entry["row_count"]) for entry in manifest] == [("2023-01", 3), ("2023-02", 2)]
+    assert not [key for entry in manifest for key in entry if key.endswith("_epoch")]
+
+    chats, has_more = ArchiveService.query_archived_chats(start="2023-01-11", end="2023-02-10")
+    assert [chat["user_query"] for chat in chats] == ["q1", "q2", "q0"] and not has_more
+    assert "timestamp_epoch" not in chats[0]
+    chats, has_more = ArchiveService.query_archived_chats(limit=4)
+    assert len(chats) == 4 and has_more
+
+
+def test_archive_runs_in_the_same_second_keep_both_files(db, archive_dir, monkeypatch):
+    migrations.migrate(db)
+    monkeypatch.setattr(archive_service, "datetime", _FrozenDatetime)
+    _old_chats(2)
+    first = ArchiveService.archive_old_chats(retention_days=30)["files"]
+    _old_chats(2)
+    second = ArchiveService.archive_old_chats(retention_days=30)["files"]
+
+    assert first != second
+    assert sorted(os.listdir(archive_dir)) == sorted(first + second)
+    assert sum(entry["row_count"] for entry in ArchiveService.list_archives()) == 4
+
+
+def test_archive_discards_file_when_rows_changed(db, archive_dir, monkeypatch):
+    migrations.migrate(db)
+    _old_chats(3)
+    commit_archive = ArchiveRepository.commit_archive
+
+    def rows_changed(entry, cutoff):
+        # A row of the file is deleted between writing it and committing
+        with connection.connect() as conn:
+            conn.execute("DELETE FROM chat_history WHERE id = 2")
+        return commit_archive(entry, cutoff)
+
+    monkeypatch.setattr(ArchiveRepository, "commit_archive", staticmethod(rows_changed))
+    summary = ArchiveService.archive_old_chats(retention_days=30)
+    assert summary["archived_rows"] == 0 and summary["files"] == []
+    assert _chat_ids(db) == [1, 3]
+    assert os.listdir(archive_dir) == []
+    assert ArchiveService.list_archives() == []
+
+
+def test_archive_discards_file_when_commit_fails(db, archive_dir, monkeypatch):
+    migrations.migrate(db)
+    _old_chats(3)
+
+    def fail(entry, cutoff):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(ArchiveRepository, "commit_archive", staticmethod(fail))
+    with pytest.raises(sqlite3.OperationalError):
+        ArchiveService.archive_old_chats(retention_days=30)
+    assert _chat_ids(db) == [1, 2, 3]
+    assert os.listdir(archive_dir) == []
+
+
+def test_failed_commit_never_deletes_a_recorded_archive(db, archive_dir):
+    migrations.migrate(db)
+    _old_chats(2)
+    committed = ArchiveService.archive_old_chats(retention_days=30)["files"][0]
+
+    ArchiveService._discard(committed)
+    assert os.listdir(archive_dir) == [committed]
+
+
+
+# --- Analytics rollups ---
+
+def _day_totals(day="2024-01-02"):
+    series = AnalyticsRepository.get_series("day", date.fromisoformat(day), date.fromisoformat(day))
+    return series[0] if series else AnalyticsRepository._empty_bucket(day)
+
+
+def _resolved_total(conn):
+    return conn.execute("SELECT IFNULL(SUM(resolved), 0) FROM analytics_rollups WHERE granularity = 'day'").fetchone()[0]
+
+
+def _wait_for_next_second():
+    # Resolutions are only rolled up once their second is over
+    time.sleep(1.1)
+
+
+def test_refresh_rolls_up_new_rows_once(db, monkeypatch):
+    migrations.migrate(db)
+    monkeypatch.setattr(analytics_repo, "ROLLUP_BATCH", 2)
+    # 23:30 IST on Jan 1 is 18:00 UTC: bucketed on the IST day
+    ChatRepository.save_chat("2024-01-01T23:30:00+05:30", "Asha", "", "900", "q", "r", "Hostel")
+    for phone in ("900", "901", "901"):
+        ChatRepository.save_chat("2024-01-02T10:00:00+05:30", "n", "", phone, "q", "r", "Hostel")
+    ChatRepository.save_chat("2024-01-02T11:00:00+05:30", "n", "", "902", "q", "r", None)
+    EscalationRepository.add_escalation("2024-01-02T10:00:00+05:30", "n", "", "900", "q", "r", "Hostel")
+
+    # Smaller batches than rows: refresh keeps going until caught up
+    assert AnalyticsRepository.refresh() == {"chats": 5, "escalations": 1, "resolutions": 0}
+    day = _day_totals()
+    assert (day["queries"], day["escalations"], day["active_users"]) == (4, 1, 3)
+    assert day["categories"] == {"Hostel": 3, "Uncategorized": 1}
+    assert _day_totals("2024-01-01")["queries"] == 1
+
+    # Nothing new: nothing is counted again
+    assert AnalyticsRepository.refresh() == {"chats": 0, "escalations": 0, "resolutions": 0}
+    assert _day_totals()["queries"] == 4
+
+
+def test_resolutions_in_the_watermark_second_are_not_lost(db):
+    migrations.migrate(db)
+    for _ in range(2):
+        EscalationRepository.add_escalation("2024-01-02T10:00:00+05:30", "n", "", "900", "q", "r", "Hostel")
+
+    # Both are usually resolved in the same second, around a refresh
+    EscalationRepository.update_status(1, "Finished", "")
+    AnalyticsRepository.refresh()
+    EscalationRepository.update_status(2, "Finished", "")
+    _wait_for_next_second()
+    AnalyticsRepository.refresh()
+    assert _resolved_total(db) == 2
+
+
+def test_reopened_escalation_is_resolved_once(db):
+    migrations.migrate(db)
+    EscalationRepository.add_escalation("2024-01-02T10:00:00+05:30", "n", "", "900", "q", "r", "Hostel")
+    EscalationRepository.update_status(1, "Finished", "")
+    _wait_for_next_second()
+    AnalyticsRepository.refresh()
+    first = db.execute("SELECT resolved_at, resolved_epoch FROM escalated_queries").fetchone()
+
+    EscalationRepository.update_status(1, "Initiated", "reopened")
+    EscalationRepository.update_status(1, "Finished", "")
+    _wait_for_next_second()
+    AnalyticsRepository.refresh()
+    assert _resolved_total(db) == 1
+    assert tuple(db.execute("SELECT resolved_at, resolved_epoch FROM escalated_queries").fetchone()) == tuple(first)
+
+class _FrozenDatetime(archive_service.datetime):
+    """Every run starts in the same second."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2024, 1, 1, 12, 0, 0, tzinfo=tz)